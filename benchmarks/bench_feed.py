@@ -0,0 +1,92 @@
+"""Synthetic feed benchmark: fan-out write cost and page-load latency vs follower count.
+
+    python benchmarks/bench_feed.py
+    python benchmarks/bench_feed.py --followers 100 1000 10000 50000 --posts 2000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from upright.feed import DEFAULT_PAGE_SIZE, FeedEngine  # noqa: E402
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def run(follower_count, posts, authors, page_size, timeline_capacity, seed):
+    rng = random.Random(seed)
+    path = os.path.join(tempfile.mkdtemp(prefix="bench_feed_"), "feed.sqlite3")
+    engine = FeedEngine(path=path, timeline_capacity=timeline_capacity)
+    # Every reader follows every author, so each author has `follower_count` followers.
+    # The graph is seeded in one transaction; follow() would commit once per edge.
+    readers = [f"reader_{i}" for i in range(follower_count)]
+    author_names = [f"author_{i}" for i in range(authors)]
+    with engine.pool.transaction() as conn:
+        conn.executemany(
+            "INSERT INTO feed_follows (follower, followee) VALUES (?, ?)",
+            [(reader, author) for author in author_names for reader in readers],
+        )
+
+    publish_ms = []
+    for i in range(posts):
+        start = time.perf_counter()
+        engine.publish(rng.choice(author_names), f"moment {i}")
+        publish_ms.append((time.perf_counter() - start) * 1000)
+
+    first_page_ms = []
+    deep_page_ms = []
+    for reader in rng.sample(readers, min(200, len(readers))):
+        start = time.perf_counter()
+        _, cursor = engine.page(reader, limit=page_size)
+        first_page_ms.append((time.perf_counter() - start) * 1000)
+        # Walk a few pages down to show cursor pages cost the same as the first one
+        for _ in range(5):
+            if cursor is None:
+                break
+            start = time.perf_counter()
+            _, cursor = engine.page(reader, cursor, limit=page_size)
+            deep_page_ms.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "followers": follower_count,
+        "publish_p50": statistics.median(publish_ms),
+        "publish_p95": percentile(publish_ms, 95),
+        "first_page_p50": statistics.median(first_page_ms),
+        "first_page_p95": percentile(first_page_ms, 95),
+        "next_page_p50": statistics.median(deep_page_ms) if deep_page_ms else float("nan"),
+        "next_page_p95": percentile(deep_page_ms, 95) if deep_page_ms else float("nan"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--followers", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--posts", type=int, default=1000)
+    parser.add_argument("--authors", type=int, default=5)
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE)
+    parser.add_argument("--timeline-capacity", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    header = f"{'followers':>10} | {'publish p50/p95 ms':>20} | {'first page p50/p95 ms':>22} | {'next page p50/p95 ms':>21}"
+    print(header)
+    print("-" * len(header))
+    for follower_count in args.followers:
+        r = run(follower_count, args.posts, args.authors, args.page_size, args.timeline_capacity, args.seed)
+        print(
+            f"{r['followers']:>10} | {r['publish_p50']:>9.3f} / {r['publish_p95']:<8.3f} | "
+            f"{r['first_page_p50']:>10.4f} / {r['first_page_p95']:<9.4f} | "
+            f"{r['next_page_p50']:>9.4f} / {r['next_page_p95']:<9.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
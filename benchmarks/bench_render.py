@@ -0,0 +1,238 @@
+"""Headless per-flow render benchmark built on Streamlit's AppTest harness.
+
+Scripts realistic user flows against UpRightApp.py and reports p50/p95
+rerun latency and peak Python heap (tracemalloc) per flow. Results can be stored as a
+baseline and later checked against it. The check gates on the median and the heap;
+p95 is reported but too close to the slowest sample to gate on.
+
+    python benchmarks/bench_render.py                    # print a report
+    python benchmarks/bench_render.py --save-baseline    # write benchmarks/baselines/render.json
+    python benchmarks/bench_render.py --check            # exit 1 if a p50 regressed past --threshold
+
+AppTest cannot drive st.file_uploader, so the avatar flow runs the same
+pipeline the upload callback uses: upright.avatars.ingest_upload on a
+camera-sized JPEG, followed by the rerun that renders the new sidebar avatar.
+"""
+import argparse
+import io
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# Benchmark data must never land in the real local store
+os.environ.setdefault("UPRIGHT_DATA_DIR", tempfile.mkdtemp(prefix="upright-bench-"))
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+# AppTest warns about a missing ScriptRunContext whenever the harness itself
+# touches session state; that noise would drown the report
+# (a filter, because Streamlit resets its loggers' levels when the app starts)
+logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").addFilter(
+    lambda record: "missing ScriptRunContext" not in record.getMessage()
+)
+
+APP_PATH = os.path.join(ROOT, "UpRightApp.py")
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "baselines", "render.json")
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_ITERATIONS = 20
+GATED_METRICS = ("p50_ms", "peak_heap_mb")
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# FLOWS
+# Each flow is a generator. Its first yield marks the end of untimed setup
+# (e.g. logging in); after that it yields once per rerun it triggers, so the
+# runner can time reruns individually.
+# ──────────────────────────────────────────────────────────────────────────────
+def _new_app():
+    return AppTest.from_file(APP_PATH, default_timeout=60)
+
+
+def _logged_in_app(username):
+    at = _new_app().run()
+    at.text_input(key="profile_username").input(username)
+    at.text_input(key="profile_full_name").input(username.title())
+    at.button[0].click().run()
+    return at
+
+
+def flow_create_profile(i):
+    at = _new_app()
+    yield at
+    at.run()
+    yield at
+    at.text_input(key="profile_username").input(f"bench_user_{i}")
+    at.text_input(key="profile_full_name").input(f"Bench User {i}")
+    at.button[0].click().run()
+    yield at
+
+
+def flow_save_indicators(i):
+    at = _logged_in_app(f"bench_saver_{i}")
+    yield at
+    for step in range(5):
+        at.number_input(key="income_input").set_value(1000.0 + step)
+        at.number_input(key="assets_input").set_value(5000.0 + step * 10)
+        at.number_input(key="books_input").set_value(step)
+        at.button(key="FormSubmitter:indicators_form-Save Indicators").click().run()
+        yield at
+
+
+def flow_toggle_chart(i):
+    at = _logged_in_app(f"bench_toggler_{i}")
+    yield at
+    for style in ("Bar", "Line", "Bar", "Line"):
+        at.radio(key="dashboard_chart_type").set_value(style).run()
+        yield at
+
+
+def _camera_jpeg():
+    from PIL import Image
+
+    buf = io.BytesIO()
+    Image.new("RGB", (4032, 3024), "#3B82F6").save(buf, format="JPEG", quality=90)
+    return buf.getvalue()
+
+
+def flow_upload_avatar(i):
+    from upright.avatars import ingest_upload
+    from upright.db import ConnectionPool
+    from upright.profile_store import ProfileStore
+    from upright.resources import get_session_vault
+
+    at = _logged_in_app(f"bench_avatar_{i}")
+    profiles = ProfileStore(ConnectionPool())
+    # Vary the bytes per iteration so every upload is a cache miss
+    raw = _camera_jpeg() + str(i).encode()
+    yield at
+    user_id = get_session_vault().checkout(at.session_state["session_key"]).profile.user_id
+    profiles.update(user_id, photo_key=ingest_upload(raw))
+    at.run()
+    yield at
+
+
+def flow_navigate(i):
+    at = _logged_in_app(f"bench_nav_{i}")
+    yield at
+    for section in ("Feed", "Explore", "Notifications", "Edit Profile", "Dashboard"):
+        at.sidebar.radio[0].set_value(section).run()
+        yield at
+
+
+FLOWS = {
+    "create_profile": flow_create_profile,
+    "save_indicators": flow_save_indicators,
+    "toggle_chart": flow_toggle_chart,
+    "upload_avatar": flow_upload_avatar,
+    "navigate": flow_navigate,
+}
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# RUNNER
+# ──────────────────────────────────────────────────────────────────────────────
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _check(at, flow_name):
+    if at.exception:
+        raise RuntimeError(f"{flow_name}: app raised {at.exception[0].message}")
+
+
+def run_flow(name, iterations, warmup):
+    flow = FLOWS[name]
+    # Warm-up iterations pay one-off costs (lazy imports, caches) outside the samples
+    for i in range(warmup):
+        for at in flow(-1 - i):
+            _check(at, name)
+
+    latencies_ms = []
+    for i in range(iterations):
+        steps = flow(i)
+        next(steps)  # untimed setup
+        while True:
+            start = time.perf_counter()
+            try:
+                at = next(steps)
+            except StopIteration:
+                break
+            latencies_ms.append((time.perf_counter() - start) * 1000)
+            _check(at, name)
+
+    # Separate pass for memory: tracemalloc slows execution and would skew latency
+    tracemalloc.start()
+    for at in flow(iterations):
+        _check(at, name)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "reruns": len(latencies_ms),
+        "p50_ms": round(statistics.median(latencies_ms), 2),
+        "p95_ms": round(percentile(latencies_ms, 95), 2),
+        "peak_heap_mb": round(peak / 2**20, 2),
+    }
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        for metric in GATED_METRICS:
+            limit = base[metric] * (1 + threshold)
+            if result[metric] > limit:
+                regressions.append(f"{name}.{metric}: {result[metric]} > {base[metric]} (+{threshold:.0%} = {limit:.2f})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--flows", nargs="+", choices=list(FLOWS), default=list(FLOWS))
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--check", action="store_true", help="fail if any flow regressed past --threshold")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args()
+
+    results = {}
+    header = f"{'flow':<16} | {'reruns':>6} | {'p50 ms':>8} | {'p95 ms':>8} | {'peak MB':>8}"
+    print(header)
+    print("-" * len(header))
+    for name in args.flows:
+        r = results[name] = run_flow(name, args.iterations, args.warmup)
+        print(f"{name:<16} | {r['reruns']:>6} | {r['p50_ms']:>8.2f} | {r['p95_ms']:>8.2f} | {r['peak_heap_mb']:>8.2f}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\nBaseline written to {args.baseline}")
+
+    if args.check:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print("\nRegressions:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond +{args.threshold:.0%} of baseline.")
+
+
+if __name__ == "__main__":
+    main()
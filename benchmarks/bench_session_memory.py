@@ -0,0 +1,107 @@
+"""Memory-per-session report: dict-based session state vs slot records, and
+what idle spilling leaves resident.
+
+    python benchmarks/bench_session_memory.py
+    python benchmarks/bench_session_memory.py --sessions 1000 10000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from upright.records import IndicatorRecord, ProfileRecord, SessionRecords  # noqa: E402
+from upright.sessions import SessionVault  # noqa: E402
+
+
+def _values(i):
+    return {
+        "income": 4200.0 + i,
+        "assets": 15000.0 + i,
+        "debt": 3000.0,
+        "net_worth": 12000.0 + i,
+        "accolades": f"reader #{i}",
+        "books_read": i % 40,
+        "courses_completed": i % 7,
+        "family_time": 12.5,
+        "projects_finished": i % 5,
+    }
+
+
+def build_dicts(count):
+    # The shape session state had before the slot records
+    return [
+        {"profile": {"user_id": i, "username": f"user_{i}"}, "indicators": _values(i)}
+        for i in range(count)
+    ]
+
+
+def build_records(count):
+    return [
+        SessionRecords(ProfileRecord(i, f"user_{i}"), IndicatorRecord(**_values(i)))
+        for i in range(count)
+    ]
+
+
+def measure(build):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, kept
+
+
+def run(count):
+    dict_bytes, _ = measure(lambda: build_dicts(count))
+    records_bytes, _ = measure(lambda: build_records(count))
+
+    with tempfile.TemporaryDirectory() as spill_dir:
+        vault = SessionVault(spill_dir, idle_seconds=0, start_sweeper=False)
+
+        def fill():
+            for i in range(count):
+                vault.checkout(f"session_{i}").indicators = IndicatorRecord(**_values(i))
+            return vault
+
+        vault_bytes, _ = measure(fill)
+        resident = vault.memory_report()
+        vault.spill_idle()
+        spilled = vault.memory_report()
+        spill_disk = sum(os.path.getsize(os.path.join(spill_dir, name)) for name in os.listdir(spill_dir))
+
+    return {
+        "sessions": count,
+        "dict_per_session": dict_bytes / count,
+        "records_per_session": records_bytes / count,
+        "vault_per_session": vault_bytes / count,
+        "resident_after_spill": spilled["resident_sessions"],
+        "resident_before_spill": resident["resident_sessions"],
+        "disk_per_session": spill_disk / count,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[100, 1000, 10000])
+    args = parser.parse_args()
+
+    header = (
+        f"{'sessions':>9} | {'dict B/session':>14} | {'records B/session':>17} | "
+        f"{'vault B/session':>15} | {'resident after spill':>20} | {'disk B/session':>14}"
+    )
+    print(header)
+    print("-" * len(header))
+    for count in args.sessions:
+        r = run(count)
+        print(
+            f"{r['sessions']:>9} | {r['dict_per_session']:>14.0f} | {r['records_per_session']:>17.0f} | "
+            f"{r['vault_per_session']:>15.0f} | {r['resident_after_spill']:>9} / {r['resident_before_spill']:<8} | "
+            f"{r['disk_per_session']:>14.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
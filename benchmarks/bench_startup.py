@@ -0,0 +1,115 @@
+"""Cold-start report: per-section import time and first-render time.
+
+Each section is measured in a fresh interpreter, so every number is a
+true cold start, like the first request a pod serves after a deploy.
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --sections dashboard feed --json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+APP_PATH = os.path.join(ROOT, "UpRightApp.py")
+
+# section module -> sidebar label that opens it (None: shown before a profile exists)
+SECTIONS = {
+    "profile": None,
+    "dashboard": "Dashboard",
+    "feed": "Feed",
+    "explore": "Explore",
+    "notifications": "Notifications",
+}
+
+HEAVY_MODULES = ("pandas", "plotly.express", "PIL.Image")
+
+
+def measure_section(section):
+    # Runs inside the child interpreter
+    start = time.perf_counter()
+    import streamlit  # noqa: F401
+    from streamlit.testing.v1 import AppTest
+
+    streamlit_ms = (time.perf_counter() - start) * 1000
+
+    from upright.startup import startup_report
+
+    at = AppTest.from_file(APP_PATH, default_timeout=60)
+    if SECTIONS[section] is not None:
+        # Start as a returning user who lands straight on this section, so no
+        # other section's imports leak into the measurement
+        from upright.db import ConnectionPool
+        from upright.profile_store import ProfileStore
+        from upright.resources import get_session_vault
+
+        profile = ProfileStore(ConnectionPool()).create(f"startup_bench_{section}", "Startup Bench")
+        session_key = f"startup_bench_{section}"
+        records = get_session_vault().checkout(session_key)
+        records.profile.user_id = profile["user_id"]
+        records.profile.username = profile["username"]
+        at.session_state["session_key"] = session_key
+        at.session_state["profile_created"] = True
+        at.session_state["nav_section"] = SECTIONS[section]
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+
+    report = startup_report()
+    return {
+        "section": section,
+        "streamlit_import_ms": round(streamlit_ms, 1),
+        "import_ms": report.get(section, {}).get("import_ms"),
+        "first_render_ms": report.get(section, {}).get("first_render_ms"),
+        "heavy_modules_loaded": [name for name in HEAVY_MODULES if name in sys.modules],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sections", nargs="+", choices=list(SECTIONS), default=list(SECTIONS))
+    parser.add_argument("--json", action="store_true", help="print one JSON object per section")
+    parser.add_argument("--child", choices=list(SECTIONS), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure_section(args.child)))
+        return
+
+    env = dict(os.environ)
+    # Keep benchmark data away from the real local store
+    env.setdefault("UPRIGHT_DATA_DIR", tempfile.mkdtemp(prefix="upright-startup-"))
+    results = []
+    for section in args.sections:
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", section],
+            capture_output=True,
+            text=True,
+            env=env,
+            cwd=ROOT,
+            check=True,
+        )
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    if args.json:
+        for r in results:
+            print(json.dumps(r))
+        return
+    header = f"{'section':<14} | {'import ms':>9} | {'first render ms':>15} | heavy modules loaded"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['section']:<14} | {r['import_ms'] or 0:>9.1f} | {r['first_render_ms'] or 0:>15.1f} | "
+            f"{', '.join(r['heavy_modules_loaded']) or '-'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta
+
+from upright.explore import ExploreIndex
+from upright.indicator_store import NUMERIC_INDICATORS, IndicatorStore
+
+
+def _save(store, username, day, **values):
+    indicators = {name: 0.0 for name in NUMERIC_INDICATORS}
+    indicators.update(values)
+    store.append(username, indicators, ts=datetime(2026, 1, 1) + timedelta(days=day))
+
+
+def test_seeded_trending_matches_live_scores(tmp_path):
+    store = IndicatorStore(path=tmp_path / "upright.sqlite3")
+    live = ExploreIndex()
+    for day, (books, worth) in enumerate([(1, 100), (3, 150), (4, 120), (9, 300)]):
+        _save(store, "ann", day, books_read=books, net_worth=worth)
+        live.record_save("ann", {"books_read": books, "net_worth": worth, "projects_finished": 0})
+    _save(store, "bob", 0, books_read=2)
+
+    seeded = ExploreIndex()
+    seeded.index_profile("ann", "Ann")
+    assert seeded.seed_trending(store) == 2
+    [(username, _, score)] = seeded.trending()
+    assert username == "ann"
+    assert score == live.trending()[0][2]
+
+    # The next save continues from the seeded state
+    seeded.record_save("bob", {"books_read": 5, "net_worth": 0, "projects_finished": 0})
+    assert [row[0] for row in seeded.trending()] == ["ann", "bob"]
+
+
+def test_search_index_rebuilds_from_profiles_without_losing_live_edits():
+    index = ExploreIndex()
+    index.index_profile("gone", "Old Name")
+
+    def stored():
+        yield "ann", "Ann Lee"
+        yield "anna", "Anna Park"
+        # Created and renamed on this worker while the rebuild reads the store
+        index.index_profile("bob", "Bob Lee")
+        index.rename_profile("anna", "annie", "Anna Park")
+        yield "cy", "Cy Lee"
+
+    assert index.index_profiles(stored()) == 4
+    assert [username for username, _ in index.search("lee")] == ["ann", "bob", "cy"]
+    assert index.search("lee a") == [("ann", "Ann Lee")]
+    assert index.search("park") == [("annie", "Anna Park")]
+    assert index.search("old") == []
@@ -0,0 +1,59 @@
+from upright.feed import FeedEngine, Timeline
+
+
+def test_timeline_insert_keeps_ids_sorted_and_bounded():
+    timeline = Timeline(capacity=3)
+    for post_id in (2, 5, 4, 5, 1, 7):
+        timeline.insert(post_id)
+    assert timeline.ids() == [4, 5, 7]
+
+
+def test_feed_survives_restart(tmp_path):
+    path = tmp_path / "feed.sqlite3"
+    engine = FeedEngine(path=path)
+    engine.follow("reader", "author")
+    post = engine.publish("author", "hello")
+    engine.toggle_reaction(post.post_id, "reader", "👍")
+    engine.add_comment(post.post_id, "reader", "nice")
+
+    restarted = FeedEngine(path=path)
+    posts, cursor = restarted.page("reader")
+    assert [(p.text, p.reaction_count("👍"), len(p.comments)) for p in posts] == [("hello", 1, 1)]
+    assert cursor is None
+    assert restarted.is_following("reader", "author")
+
+
+def test_workers_see_each_others_posts(tmp_path):
+    path = tmp_path / "feed.sqlite3"
+    first = FeedEngine(path=path, sync_interval=0)
+    second = FeedEngine(path=path, sync_interval=0)
+    first.follow("reader", "author")
+    second.publish("author", "from the other worker")
+    posts, _ = first.page("reader")
+    assert [p.text for p in posts] == ["from the other worker"]
+
+
+def test_rename_moves_posts_and_edges(tmp_path):
+    engine = FeedEngine(path=tmp_path / "feed.sqlite3")
+    engine.follow("reader", "old")
+    engine.publish("old", "moment")
+    engine.rename_user("old", "new")
+    posts, _ = engine.page("reader")
+    assert [p.author for p in posts] == ["new"]
+    assert engine.is_following("reader", "new")
+    assert engine.follower_count("old") == 0
+
+
+def test_timelines_load_on_demand_and_trim_old_entries(tmp_path):
+    path = tmp_path / "feed.sqlite3"
+    engine = FeedEngine(path=path, timeline_capacity=3)
+    engine.follow("reader", "author")
+    for i in range(5):
+        engine.publish("author", f"moment {i}")
+
+    restarted = FeedEngine(path=path, timeline_capacity=3)
+    assert restarted._timelines == {}
+    posts, cursor = restarted.page("reader", limit=5)
+    assert [p.text for p in posts] == ["moment 4", "moment 3", "moment 2"]
+    with restarted.pool.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM feed_timeline WHERE username = 'reader'").fetchone()[0] == 3
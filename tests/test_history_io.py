@@ -0,0 +1,66 @@
+import io
+
+import pytest
+
+from upright.history_io import FORMATS, export_history, import_history
+from upright.indicator_store import IndicatorStore
+
+HEADER = "ts,income,assets,debt,books_read,courses_completed,family_time,projects_finished,accolades\n"
+
+
+@pytest.fixture
+def store(tmp_path):
+    return IndicatorStore(path=tmp_path / "upright.sqlite3")
+
+
+def _csv(*rows):
+    return io.BytesIO((HEADER + "".join(row + "\n" for row in rows)).encode())
+
+
+def _without_username(rows):
+    return [{name: value for name, value in row.items() if name != "username"} for row in rows]
+
+
+def test_import_rejects_invalid_rows_and_skips_duplicates(store):
+    source = _csv(
+        "2026-01-01T08:00:00,100,50,10,1,0,2.5,0,first",
+        "2026-01-02T08:00:00+02:00,100,50,10,1,0,2.5,0,offset",
+        "2026-01-01T08:00:00,999,50,10,1,0,2.5,0,repeat in chunk",
+        "2026-01-03,-1,50,10,1,0,2.5,0,negative",
+        "2026-01-04,100,50,10,1.5,0,2.5,0,fractional count",
+        "not a date,100,50,10,1,0,2.5,0,bad ts",
+        "2026-01-05,,50,10,1,0,2.5,0,missing",
+        # Chunks are three rows: this repeats a timestamp stored by an earlier chunk
+        "2026-01-02T06:00:00,999,50,10,1,0,2.5,0,repeat across chunks",
+    )
+    report = import_history(store, "ann", source, "csv", chunk_rows=3)
+
+    assert (report.rows_read, report.imported, report.duplicates) == (8, 2, 2)
+    assert report.rejected == {
+        "negative value": 1,
+        "non-integer count": 1,
+        "unparseable timestamp": 1,
+        "missing or non-numeric value": 1,
+    }
+    history = store.history("ann")
+    assert [(row["ts"], row["accolades"]) for row in history] == [
+        ("2026-01-01T08:00:00", "first"),
+        ("2026-01-02T06:00:00", "offset"),
+    ]
+    assert history[0]["net_worth"] == 40
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_export_round_trips(store, tmp_path, fmt):
+    import_history(
+        store,
+        "ann",
+        _csv("2026-01-01T08:00:00,100.5,50,10,1,0,2.5,3,hello", "2026-01-02T09:30:00,120,60,5,2,1,3,3,"),
+        "csv",
+    )
+    path = export_history(store, "ann", fmt, export_dir=tmp_path / "exports")
+    with open(path, "rb") as source:
+        report = import_history(store, "bob", source, fmt)
+
+    assert (report.imported, report.duplicates, report.rejected) == (2, 0, {})
+    assert _without_username(store.history("bob")) == _without_username(store.history("ann"))
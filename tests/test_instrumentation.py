@@ -0,0 +1,15 @@
+from upright.instrumentation import record_session_state_size, registry, session_key_label
+
+
+def test_rotating_keys_share_one_label():
+    assert session_key_label("edit_photo_3") == session_key_label("edit_photo_41") == "edit_photo_n"
+    assert session_key_label("history_upload_7") == "history_upload_n"
+    assert session_key_label("income_input") == "income_input"
+
+
+def test_large_entries_do_not_grow_label_cardinality():
+    for generation in range(5):
+        record_session_state_size({f"history_upload_{generation}": b"x" * (64 << 10)})
+    _, _, _, series = registry.snapshot()["upright_session_state_bytes"]
+    assert not any(label.startswith("history_upload_") and label != "history_upload_n" for label in series)
+    assert series["history_upload_n"][2] >= 5
@@ -0,0 +1,10 @@
+from upright.db import ConnectionPool
+from upright.profile_store import ProfileStore
+
+
+def test_bio_is_stored_with_the_profile(tmp_path):
+    profiles = ProfileStore(ConnectionPool(tmp_path / "upright.sqlite3"))
+    user_id = profiles.create("ann", "Ann", bio="Reader")["user_id"]
+    assert profiles.get(user_id)["bio"] == "Reader"
+    profiles.update(user_id, bio="Runner")
+    assert profiles.get(user_id)["bio"] == "Runner"
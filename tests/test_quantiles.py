@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta
+
+from upright.indicator_store import NUMERIC_INDICATORS, IndicatorStore
+from upright.quantiles import CohortPercentiles, KLLSketch
+
+
+def _save(store, percentiles, username, day, income):
+    indicators = {name: 0.0 for name in NUMERIC_INDICATORS}
+    indicators["income"] = income
+    store.append(username, indicators, ts=datetime(2026, 1, 1) + timedelta(days=day))
+    percentiles.record_save(indicators)
+
+
+def test_lone_user_is_not_ranked_against_own_history(tmp_path):
+    store = IndicatorStore(path=tmp_path / "upright.sqlite3")
+    percentiles = CohortPercentiles(store.pool, rebuild_every=0)
+    assert percentiles.rebuild() == 0
+    _save(store, percentiles, "ann", 0, 1000)
+    _save(store, percentiles, "ann", 1, 2000)
+    # Between rebuilds both saves count...
+    assert percentiles.percentile("income", 2000) == 75
+    # ...and the drifted delta makes the next rebuild due early
+    assert percentiles.rebuild(max_age=3600) == 1
+    assert percentiles.percentile("income", 2000) == 50
+
+
+def test_workers_share_one_value_per_user(tmp_path):
+    store = IndicatorStore(path=tmp_path / "upright.sqlite3")
+    first = CohortPercentiles(store.pool, rebuild_every=0)
+    second = CohortPercentiles(store.pool, rebuild_every=0)
+    for day, username in enumerate(["ann", "bob", "cy", "dee"]):
+        _save(store, first, username, day, 1000 * (day + 1))
+    first.rebuild()
+    assert first.percentile("income", 4000) == 87.5
+
+    # A save on another worker counts once the view refreshes
+    _save(store, second, "eve", 5, 5000)
+    assert second.percentile("income", 5000) == 90
+
+    # After a rebuild on one worker, the other's old delta isn't counted twice
+    first.rebuild()
+    _save(store, second, "ann", 6, 6000)
+    first._views.clear()
+    assert first.percentile("income", 6000) == 100 - 100 / 12
+    assert second.percentile("income", 3000) == 100 * 5 / 12
+
+
+def test_rebuild_scan_does_not_block_or_lose_concurrent_saves(tmp_path, monkeypatch):
+    store = IndicatorStore(path=tmp_path / "upright.sqlite3")
+    rebuilder = CohortPercentiles(store.pool, rebuild_every=0)
+    other = CohortPercentiles(store.pool, rebuild_every=0)
+    _save(store, rebuilder, "ann", 0, 1000)
+    update = KLLSketch.update
+    saved = []
+
+    def save_during_scan(sketch, value):
+        if not saved:
+            # Another worker commits a save while the scan is reading
+            saved.append(True)
+            _save(store, other, "bob", 1, 2000)
+        update(sketch, value)
+
+    monkeypatch.setattr(KLLSketch, "update", save_during_scan)
+    assert rebuilder.rebuild() == 1
+    monkeypatch.undo()
+    # Bob isn't in the snapshot, but his delta survived the swap: both count once
+    assert rebuilder.percentile("income", 2000) == 75
+    assert rebuilder.counts_only_latest("2026-01-01T00:00:00")
+    assert not rebuilder.counts_only_latest("2099-01-01T00:00:00")
@@ -0,0 +1,75 @@
+import pytest
+
+from upright.db import ConnectionPool
+from upright.derived_metrics import DerivedMetrics
+from upright.feed import FeedEngine
+from upright.indicator_store import NUMERIC_INDICATORS, IndicatorStore
+from upright.notifications import NotificationBus
+from upright.profile_store import ProfileStore, UsernameTaken
+
+
+@pytest.fixture
+def stores(tmp_path):
+    pool = ConnectionPool(tmp_path / "upright.sqlite3")
+    return ProfileStore(pool), IndicatorStore(pool), DerivedMetrics(pool), FeedEngine(pool)
+
+
+def _save(indicators, derived, username):
+    values = {name: 1.0 for name in NUMERIC_INDICATORS}
+    ts = indicators.append(username, values)
+    derived.record_save(username, ts, values)
+
+
+def test_rename_moves_every_store(stores):
+    profiles, indicators, derived, feed = stores
+    user_id = profiles.create("old", "Old")["user_id"]
+    _save(indicators, derived, "old")
+    feed.publish("old", "moment")
+
+    assert profiles.rename(user_id, "new", cascade=(indicators, derived, feed)) == "old"
+    assert profiles.get(user_id)["username"] == "new"
+    assert indicators.count_saves("new") == 1 and indicators.count_saves("old") == 0
+    assert derived.get("new") is not None and derived.get("old") is None
+    assert [post.author for post in feed.page("new")[0]] == ["new"]
+
+
+class Broken:
+    def rename_user_in(self, conn, old_username, new_username):
+        raise RuntimeError("disk full")
+
+
+def test_failed_cascade_rolls_everything_back(stores):
+    profiles, indicators, derived, feed = stores
+    user_id = profiles.create("old", "Old")["user_id"]
+    _save(indicators, derived, "old")
+    feed.publish("old", "moment")
+
+    with pytest.raises(RuntimeError):
+        profiles.rename(user_id, "new", cascade=(indicators, derived, feed, Broken()))
+    assert profiles.get(user_id)["username"] == "old"
+    assert indicators.count_saves("old") == 1
+    assert derived.get("old") is not None
+    assert [post.author for post in feed.page("old")[0]] == ["old"]
+
+
+def test_rename_to_taken_username(stores):
+    profiles, indicators, derived, feed = stores
+    user_id = profiles.create("old", "Old")["user_id"]
+    profiles.create("taken", "Taken")
+    with pytest.raises(UsernameTaken):
+        profiles.rename(user_id, "TAKEN", cascade=(indicators, derived, feed))
+    assert profiles.get(user_id)["username"] == "old"
+
+
+def test_notifications_follow_the_rename():
+    bus = NotificationBus()
+    bus.publish("old", "follow", "fan")
+    bus.publish("fan", "follow", "old")
+    bus.rename_user("old", "new")
+    bus.publish("new", "follow", "other")
+    bus.flush()
+    assert bus.unread_count("old") == 0 and bus.recent("old") == []
+    # The new follow folds into the moved, still-unread digest
+    [note] = bus.recent("new")
+    assert (note.recipient, note.count, bus.unread_count("new")) == ("new", 2, 1)
+    assert bus.recent("fan")[0].actors == ["new"]
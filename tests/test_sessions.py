@@ -0,0 +1,22 @@
+import errno
+import pickle
+
+from upright.sessions import SessionVault
+
+
+def test_failed_spill_keeps_the_session_resident(tmp_path, monkeypatch):
+    vault = SessionVault(spill_dir=tmp_path, idle_seconds=0, start_sweeper=False)
+    vault.checkout("tab").profile.username = "ann"
+
+    def disk_full(*args, **kwargs):
+        raise OSError(errno.ENOSPC, "No space left on device")
+
+    monkeypatch.setattr(pickle, "dump", disk_full)
+    assert vault.spill_idle() == 0
+    assert list(tmp_path.iterdir()) == []
+    assert vault.checkout("tab").profile.username == "ann"
+
+    monkeypatch.undo()
+    assert vault.spill_idle() == 1
+    assert [path.name for path in tmp_path.iterdir()] == ["tab.pkl"]
+    assert vault.checkout("tab").profile.username == "ann"
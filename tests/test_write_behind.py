@@ -0,0 +1,110 @@
+from datetime import datetime
+
+import pytest
+
+from upright.db import ConnectionPool
+from upright.derived_metrics import DerivedMetrics
+from upright.indicator_store import NUMERIC_INDICATORS, IndicatorStore
+from upright.profile_store import ProfileStore
+from upright.write_behind import PendingWrite, WriteBehindQueue
+
+
+@pytest.fixture
+def stores(tmp_path):
+    pool = ConnectionPool(tmp_path / "upright.sqlite3")
+    return IndicatorStore(pool), DerivedMetrics(pool), ProfileStore(pool)
+
+
+def _queue(stores, tmp_path, **kwargs):
+    return WriteBehindQueue(*stores, journal_dir=tmp_path / "journals", **kwargs)
+
+
+def _snapshot(day, income):
+    payload = {name: 0.0 for name in NUMERIC_INDICATORS}
+    payload.update(income=income, ts=datetime(2026, 1, day).isoformat(timespec="seconds"), accolades="")
+    return payload
+
+
+def _crash(tmp_path, lines):
+    # What a killed process leaves behind: its journal and an unheld lock file
+    journal = tmp_path / "journals" / "crashed.jsonl"
+    journal.write_text("".join(write.to_json() + "\n" for write in lines))
+    (tmp_path / "journals" / "crashed.lock").touch()
+
+
+def test_saves_coalesce_and_read_back_while_pending(stores, tmp_path):
+    store, derived, _ = stores
+    queue = _queue(stores, tmp_path, linger=0.5)
+    queue.save_indicators("ann", {name: 1.0 for name in NUMERIC_INDICATORS})
+    queue.save_indicators("ann", {name: 2.0 for name in NUMERIC_INDICATORS})
+    assert queue.pending_indicators("ann")["income"] == 2.0
+    assert queue.flush(timeout=5)
+    assert queue.pending_indicators("ann") is None
+    assert [row["income"] for row in store.history("ann")] == [2.0]
+    assert derived.get("ann")["saves"] == 1
+    assert queue.stats["coalesced"] == 1
+    queue.close()
+
+
+def test_replay_keeps_saves_journaled_after_a_commit(stores, tmp_path):
+    store, derived, profiles = stores
+    user_id = profiles.create("ann", "Ann")["user_id"]
+    live = _queue(stores, tmp_path)
+    # seq 1 and 3 committed before the crash, seq 2 and 4 were only journaled
+    first_save = PendingWrite("indicators", "ann", _snapshot(1, 100.0), [1])
+    first_name = PendingWrite("profile", user_id, {"full_name": "Ann B"}, [3])
+    live._commit("crashed", [first_save, first_name])
+    _crash(
+        tmp_path,
+        [
+            first_save,
+            PendingWrite("indicators", "ann", _snapshot(2, 200.0), [2]),
+            first_name,
+            PendingWrite("profile", user_id, {"photo_key": "abc"}, [4]),
+        ],
+    )
+
+    restarted = _queue(stores, tmp_path)
+    assert restarted.stats["replayed"] == 2
+    assert [row["income"] for row in store.history("ann")] == [100.0, 200.0]
+    assert derived.get("ann")["saves"] == 2
+    profile = profiles.get(user_id)
+    assert (profile["full_name"], profile["photo_key"]) == ("Ann B", "abc")
+    assert not (tmp_path / "journals" / "crashed.jsonl").exists()
+
+    # Replaying is exactly-once: nothing is left for the next start
+    assert restarted.replay_orphans() == 0
+    assert store.count_saves("ann") == 2
+    live.close()
+    restarted.close()
+
+
+def test_journal_replayed_by_another_worker_is_skipped(stores, tmp_path, monkeypatch):
+    from upright import write_behind
+
+    live = _queue(stores, tmp_path)
+    _crash(tmp_path, [PendingWrite("indicators", "ann", _snapshot(1, 100.0), [1])])
+    flock = write_behind.fcntl.flock
+
+    def replayed_meanwhile(file, flags):
+        if file.name.endswith("crashed.lock"):
+            # Another worker finished replaying between listdir() and our lock
+            (tmp_path / "journals" / "crashed.jsonl").unlink()
+        flock(file, flags)
+
+    monkeypatch.setattr(write_behind.fcntl, "flock", replayed_meanwhile)
+    restarted = _queue(stores, tmp_path)
+    assert restarted.stats["replayed"] == 0
+    assert not (tmp_path / "journals" / "crashed.lock").exists()
+    live.close()
+    restarted.close()
+
+
+def test_failed_start_leaves_no_lock_file(stores, tmp_path, monkeypatch):
+    def database_down(self):
+        raise OSError("database is down")
+
+    monkeypatch.setattr(WriteBehindQueue, "replay_orphans", database_down)
+    with pytest.raises(OSError):
+        _queue(stores, tmp_path)
+    assert list((tmp_path / "journals").iterdir()) == []
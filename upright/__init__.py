@@ -0,0 +1 @@
+# UpRight backend modules used by UpRightApp.py
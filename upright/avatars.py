@@ -0,0 +1,75 @@
+import hashlib
+import io
+import os
+
+from upright.db import DEFAULT_DATA_DIR
+from upright.instrumentation import timed
+
+# ──────────────────────────────────────────────────────────────────────────────
+# AVATAR PIPELINE
+#
+# An upload is decoded once and turned into fixed-size square PNG
+# thumbnails. These are stored on disk under the SHA-256 of the original
+# bytes, so session state only keeps that hash. The sidebar and preview
+# then hand Streamlit a file that already has the right size and format,
+# and nothing gets re-encoded on a rerun.
+# ──────────────────────────────────────────────────────────────────────────────
+
+SIDEBAR_SIZE = 80
+PREVIEW_SIZE = 100
+THUMBNAIL_SIZES = (SIDEBAR_SIZE, PREVIEW_SIZE)
+
+AVATAR_CACHE_DIR = os.path.join(DEFAULT_DATA_DIR, "avatars")
+
+# Bundled default robot avatar, one pre-rendered file per thumbnail size
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets")
+
+
+def default_avatar_path(size):
+    return os.path.join(ASSETS_DIR, f"default_avatar_{size}.png")
+
+
+def avatar_key(raw_bytes):
+    return hashlib.sha256(raw_bytes).hexdigest()
+
+
+def thumbnail_path(key, size, cache_dir=AVATAR_CACHE_DIR):
+    """Path of the `size`px thumbnail for `key`; the default avatar if `key` is None."""
+    if key is None:
+        return default_avatar_path(size)
+    # Two-level fan-out keeps directory listings short
+    return os.path.join(cache_dir, key[:2], f"{key}_{size}.png")
+
+
+def ingest_upload(raw_bytes, cache_dir=AVATAR_CACHE_DIR):
+    """Store thumbnails for an uploaded image and return its content hash.
+
+    Uploading the same image again is a cache hit: only the hash is computed.
+    Raises PIL.UnidentifiedImageError if the bytes are not a readable image.
+    """
+    key = avatar_key(raw_bytes)
+    paths = {size: thumbnail_path(key, size, cache_dir) for size in THUMBNAIL_SIZES}
+    if all(os.path.exists(path) for path in paths.values()):
+        return key
+
+    # Pillow is only needed when a new image has to be decoded
+    from PIL import Image, ImageOps
+
+    with timed("avatar_encode"):
+        image = Image.open(io.BytesIO(raw_bytes))
+        # Let the JPEG decoder downscale by DCT while decoding; this is the bulk of
+        # the saving on multi-megapixel camera photos
+        largest = max(THUMBNAIL_SIZES)
+        image.draft("RGB", (largest * 2, largest * 2))
+        image = ImageOps.exif_transpose(image)
+        image = image.convert("RGBA")
+        square = ImageOps.fit(image, (largest, largest), method=Image.LANCZOS)
+
+        os.makedirs(os.path.dirname(paths[largest]), exist_ok=True)
+        for size, path in paths.items():
+            thumb = square if size == largest else square.resize((size, size), Image.LANCZOS)
+            # Write to a temporary name and rename so readers never see a partial file
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            thumb.save(tmp_path, format="PNG", optimize=True)
+            os.replace(tmp_path, path)
+    return key
@@ -0,0 +1,187 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from upright.instrumentation import timed
+
+# ──────────────────────────────────────────────────────────────────────────────
+# MEMOIZED FIGURE PIPELINE
+#
+# Figures are cached per process (so identical inputs are shared across
+# sessions) under a content hash of everything that affects the drawing.
+# A cache hit returns the stored figure without touching pandas or plotly,
+# which are only imported when the first figure is actually built.
+# Cached figures are shared: callers must treat them as read-only.
+# ──────────────────────────────────────────────────────────────────────────────
+
+FIGURE_CACHE_SIZE = int(os.environ.get("UPRIGHT_FIGURE_CACHE_SIZE", "256"))
+
+DASHBOARD_CATEGORIES = (
+    ("Income", "income"),
+    ("Assets", "assets"),
+    ("Debt", "debt"),
+    ("Net Worth", "net_worth"),
+    ("Books Read", "books_read"),
+    ("Courses", "courses_completed"),
+    ("Family Time", "family_time"),
+    ("Projects", "projects_finished"),
+)
+
+HISTORY_SERIES = ("income", "assets", "debt", "net_worth")
+HISTORY_POINT_BUDGET = int(os.environ.get("UPRIGHT_CHART_POINT_BUDGET", "500"))
+WEBGL_POINT_THRESHOLD = int(os.environ.get("UPRIGHT_WEBGL_POINT_THRESHOLD", "1000"))
+HISTORY_COLORS = ("#3B82F6", "#10B981", "#EF4444", "#FACC15")
+
+BASE_LAYOUT = dict(
+    margin=dict(l=0, r=0, t=20, b=20),
+    xaxis_title=None,
+    yaxis_title="Value",
+    plot_bgcolor="#FFFFFF",
+    paper_bgcolor="#F9FAFB",
+    font=dict(color="#1F2937"),
+)
+
+
+class FigureCache:
+    """Thread-safe, bounded LRU cache of figures keyed by content hash."""
+
+    def __init__(self, max_entries=FIGURE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, key, build):
+        with self._lock:
+            fig = self._entries.get(key)
+            if fig is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return fig
+            self.misses += 1
+        # Build outside the lock so a slow build doesn't block other sessions
+        fig = build()
+        with self._lock:
+            self._entries[key] = fig
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return fig
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+figure_cache = FigureCache()
+
+
+def content_key(*parts):
+    payload = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# DASHBOARD SNAPSHOT CHART
+# ──────────────────────────────────────────────────────────────────────────────
+def dashboard_figure(indicators, chart_type):
+    values = [indicators[field] for _, field in DASHBOARD_CATEGORIES]
+    key = content_key("dashboard", values, chart_type)
+    return figure_cache.get_or_build(key, lambda: _build_dashboard_figure(values, chart_type))
+
+
+def _build_dashboard_figure(values, chart_type):
+    import pandas as pd
+    import plotly.express as px
+
+    with timed("dataframe_build"):
+        chart_df = pd.DataFrame(
+            {
+                "Category": [label for label, _ in DASHBOARD_CATEGORIES],
+                "Value": values,
+            }
+        )
+    with timed("figure_build"):
+        if chart_type == "Bar":
+            fig = px.bar(
+                chart_df,
+                x="Category",
+                y="Value",
+                color="Category",
+                color_discrete_sequence=["#EF4444", "#3B82F6", "#FACC15", "#10B981", "#3B82F6", "#EF4444", "#10B981", "#FACC15"],
+                height=450,
+            )
+        else:
+            fig = px.line(
+                chart_df,
+                x="Category",
+                y="Value",
+                markers=True,
+                color_discrete_sequence=["#10B981"],
+                height=450,
+            )
+        fig.update_layout(**BASE_LAYOUT)
+    return fig
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# PROGRESS-OVER-TIME CHART
+#
+# Each series is downsampled with LTTB to HISTORY_POINT_BUDGET points before
+# anything is hashed or drawn, so payload size is bounded however long the
+# history is. Above WEBGL_POINT_THRESHOLD points in total the traces are
+# drawn with WebGL (scattergl) instead of SVG.
+# ──────────────────────────────────────────────────────────────────────────────
+def history_figure(rows, x_field="bucket", point_budget=HISTORY_POINT_BUDGET):
+    with timed("downsample"):
+        series = _downsample_series(rows, x_field, point_budget)
+    key = content_key("history", series)
+    return figure_cache.get_or_build(key, lambda: _build_history_figure(series))
+
+
+def _downsample_series(rows, x_field, point_budget):
+    # {series name: (x values, y values)} with at most point_budget points each
+    from upright.downsample import lttb_indices
+
+    if len(rows) <= point_budget:
+        xs = [row[x_field] for row in rows]
+        return {name: (xs, [row[name] for row in rows]) for name in HISTORY_SERIES}
+
+    import numpy as np
+
+    xs = np.array([row[x_field] for row in rows], dtype="datetime64[s]")
+    x_numeric = xs.astype(np.int64)
+    series = {}
+    for name in HISTORY_SERIES:
+        ys = np.array([row[name] for row in rows], dtype=float)
+        keep = lttb_indices(x_numeric, ys, point_budget)
+        series[name] = (xs[keep].astype(str).tolist(), ys[keep].tolist())
+    return series
+
+
+def _build_history_figure(series):
+    # Traces are built directly: plotly.express' dataframe grouping costs far
+    # more than drawing a few hundred points
+    import plotly.graph_objects as go
+
+    total_points = sum(len(xs) for xs, _ in series.values())
+    webgl = total_points > WEBGL_POINT_THRESHOLD
+    trace_type = go.Scattergl if webgl else go.Scatter
+    with timed("figure_build"):
+        fig = go.Figure(
+            [
+                trace_type(x=xs, y=ys, name=name, mode="lines" if webgl else "lines+markers", line=dict(color=color))
+                for (name, (xs, ys)), color in zip(series.items(), HISTORY_COLORS)
+            ],
+            layout=dict(height=350),
+        )
+        fig.update_layout(legend_title_text=None, **BASE_LAYOUT)
+    return fig
@@ -0,0 +1,88 @@
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+# ──────────────────────────────────────────────────────────────────────────────
+# EMBEDDED DATABASE + CONNECTION POOL
+#
+# All stores share one SQLite database in WAL mode, reached through a
+# process-wide pool (see upright/resources.py). WAL lets pooled readers run
+# concurrently with the single active writer; writers wait on SQLite's busy
+# timeout instead of failing.
+# ──────────────────────────────────────────────────────────────────────────────
+
+DEFAULT_DATA_DIR = os.environ.get(
+    "UPRIGHT_DATA_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".upright_data"),
+)
+
+DEFAULT_POOL_SIZE = int(os.environ.get("UPRIGHT_DB_POOL_SIZE", "4"))
+BUSY_TIMEOUT_SECONDS = 10.0
+
+
+def default_db_path():
+    os.makedirs(DEFAULT_DATA_DIR, exist_ok=True)
+    return os.path.join(DEFAULT_DATA_DIR, "upright.sqlite3")
+
+
+class ConnectionPool:
+    """Bounded pool of autocommit SQLite connections usable from any thread."""
+
+    def __init__(self, path=None, size=DEFAULT_POOL_SIZE):
+        self.path = path if path is not None else default_db_path()
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=BUSY_TIMEOUT_SECONDS)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                try:
+                    return self._connect()
+                except Exception:
+                    self._created -= 1
+                    raise
+        # Pool exhausted: wait for another thread to hand a connection back
+        return self._idle.get(timeout=BUSY_TIMEOUT_SECONDS)
+
+    @contextmanager
+    def connection(self):
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    @contextmanager
+    def transaction(self):
+        """A connection inside BEGIN IMMEDIATE ... COMMIT, rolled back on error."""
+        with self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
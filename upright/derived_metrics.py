@@ -0,0 +1,244 @@
+from upright.db import ConnectionPool
+from upright.instrumentation import timed
+
+# ──────────────────────────────────────────────────────────────────────────────
+# DERIVED METRICS
+#
+# One row per user in `derived_metrics` holds everything computed from
+# their indicator saves: net worth (assets - debt), growth since the
+# previous save, exponential moving averages and progress streaks.
+#
+# A new save advances the row in O(1) from the stored state, since the
+# EMA, growth and streak updates only need the previous values. Saves
+# that arrive out of order (imports) and backfills go through recompute(),
+# which rebuilds the rows with vectorized pandas over whole users, a batch
+# of users at a time. Both paths give identical results. Explore reads
+# the precomputed columns (see leaders()).
+# ──────────────────────────────────────────────────────────────────────────────
+
+EMA_SPAN = 7  # saves
+EMA_ALPHA = 2 / (EMA_SPAN + 1)
+# Counts whose streak is the number of consecutive saves that raised them
+STREAK_INDICATORS = {"books_read": "books_streak", "courses_completed": "courses_streak", "projects_finished": "projects_streak"}
+RECOMPUTE_USER_BATCH = 500
+
+# Column -> (label, format); the columns Explore can rank users by
+LEADER_METRICS = {
+    "net_worth_growth": ("Net worth growth", "{:+.1%}"),
+    "income_growth": ("Income growth", "{:+.1%}"),
+    "books_streak": ("Reading streak", "{:d} saves"),
+    "courses_streak": ("Course streak", "{:d} saves"),
+    "projects_streak": ("Project streak", "{:d} saves"),
+}
+
+STATE_COLUMNS = (
+    "last_ts",
+    "saves",
+    "income",
+    "net_worth",
+    *STREAK_INDICATORS,
+    "income_growth",
+    "net_worth_growth",
+    "income_ema",
+    "net_worth_ema",
+    *STREAK_INDICATORS.values(),
+)
+
+
+def net_worth(assets, debt):
+    return assets - debt
+
+
+def growth(previous, current):
+    # Relative change since the previous save; undefined from a zero base
+    if previous is None or previous == 0:
+        return None
+    return (current - previous) / abs(previous)
+
+
+def next_state(prev, ts_text, indicators):
+    """The derived row after one save at `ts_text`, given the previous row (or None)."""
+    income = float(indicators["income"])
+    worth = net_worth(float(indicators["assets"]), float(indicators["debt"]))
+    counts = {name: float(indicators[name]) for name in STREAK_INDICATORS}
+    if prev is None:
+        row = {
+            "saves": 1,
+            "income_growth": None,
+            "net_worth_growth": None,
+            "income_ema": income,
+            "net_worth_ema": worth,
+            **{streak: 0 for streak in STREAK_INDICATORS.values()},
+        }
+    else:
+        row = {
+            "saves": prev["saves"] + 1,
+            "income_growth": growth(prev["income"], income),
+            "net_worth_growth": growth(prev["net_worth"], worth),
+            "income_ema": prev["income_ema"] + EMA_ALPHA * (income - prev["income_ema"]),
+            "net_worth_ema": prev["net_worth_ema"] + EMA_ALPHA * (worth - prev["net_worth_ema"]),
+            **{
+                streak: prev[streak] + 1 if counts[name] > prev[name] else 0
+                for name, streak in STREAK_INDICATORS.items()
+            },
+        }
+    row.update(last_ts=ts_text, income=income, net_worth=worth, **counts)
+    return row
+
+
+class DerivedMetrics:
+    """Per-user derived indicator metrics, updated incrementally on save."""
+
+    def __init__(self, pool=None, path=None):
+        self.pool = pool if pool is not None else ConnectionPool(path)
+        self._create_schema()
+
+    def _create_schema(self):
+        leader_indexes = "\n".join(
+            f"CREATE INDEX IF NOT EXISTS idx_derived_{column} ON derived_metrics ({column});"
+            for column in LEADER_METRICS
+        )
+        with self.pool.connection() as conn:
+            conn.executescript(
+                f"""
+                CREATE TABLE IF NOT EXISTS derived_metrics (
+                    username TEXT PRIMARY KEY,
+                    last_ts TEXT NOT NULL,
+                    saves INTEGER NOT NULL,
+                    income REAL NOT NULL,
+                    net_worth REAL NOT NULL,
+                    books_read REAL NOT NULL,
+                    courses_completed REAL NOT NULL,
+                    projects_finished REAL NOT NULL,
+                    income_growth REAL,
+                    net_worth_growth REAL,
+                    income_ema REAL NOT NULL,
+                    net_worth_ema REAL NOT NULL,
+                    books_streak INTEGER NOT NULL,
+                    courses_streak INTEGER NOT NULL,
+                    projects_streak INTEGER NOT NULL
+                );
+                {leader_indexes}
+                """
+            )
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # INCREMENTAL UPDATE
+    # ──────────────────────────────────────────────────────────────────────────
+    @timed("derived_update")
+    def record_save(self, username, ts_text, indicators):
+        """Advance `username`'s metrics by one save made at `ts_text`."""
+        with self.pool.transaction() as conn:
+            self.advance(conn, username, ts_text, indicators)
+
+    def advance(self, conn, username, ts_text, indicators):
+        """record_save() inside the caller's transaction (see upright/write_behind.py)."""
+        prev = conn.execute("SELECT * FROM derived_metrics WHERE username = ?", [username]).fetchone()
+        if prev is not None and ts_text < prev["last_ts"]:
+            # An older save changes everything after it: rebuild this user
+            self._recompute_batch(conn, [username])
+            return
+        row = next_state(prev, ts_text, indicators)
+        self._write(conn, [[username, *(row[column] for column in STATE_COLUMNS)]])
+
+    def _write(self, conn, rows):
+        cols = ", ".join(("username", *STATE_COLUMNS))
+        marks = ", ".join("?" for _ in range(len(STATE_COLUMNS) + 1))
+        conn.executemany(f"INSERT OR REPLACE INTO derived_metrics ({cols}) VALUES ({marks})", rows)
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # BATCH RECOMPUTE
+    # ──────────────────────────────────────────────────────────────────────────
+    @timed("derived_recompute")
+    def recompute(self, usernames=None, batch_size=RECOMPUTE_USER_BATCH):
+        """Rebuild metrics from the raw saves for `usernames` (default: every user).
+
+        Users are processed `batch_size` at a time; within a batch all
+        computations are vectorized across users.
+        """
+        if usernames is None:
+            with self.pool.connection() as conn:
+                usernames = [row[0] for row in conn.execute("SELECT DISTINCT username FROM indicator_saves ORDER BY username")]
+        usernames = list(dict.fromkeys(usernames))
+        for start in range(0, len(usernames), batch_size):
+            with self.pool.transaction() as conn:
+                self._recompute_batch(conn, usernames[start:start + batch_size])
+        return len(usernames)
+
+    def backfill(self):
+        """Compute metrics for users with saves but no derived row (e.g. history from before this table)."""
+        with self.pool.connection() as conn:
+            missing = [
+                row[0]
+                for row in conn.execute(
+                    "SELECT DISTINCT s.username FROM indicator_saves s "
+                    "LEFT JOIN derived_metrics d ON d.username = s.username WHERE d.username IS NULL"
+                )
+            ]
+        return self.recompute(missing) if missing else 0
+
+    def _recompute_batch(self, conn, usernames):
+        import pandas as pd
+
+        marks = ", ".join("?" for _ in usernames)
+        df = pd.read_sql_query(
+            f"SELECT username, ts, income, assets, debt, {', '.join(STREAK_INDICATORS)} FROM indicator_saves "
+            f"WHERE username IN ({marks}) ORDER BY username, ts, rowid",
+            conn,
+            params=usernames,
+        )
+        conn.execute(f"DELETE FROM derived_metrics WHERE username IN ({marks})", usernames)
+        if df.empty:
+            return
+        df["net_worth"] = net_worth(df["assets"], df["debt"])
+        by_user = df.groupby("username", sort=False)
+        for name in ("income", "net_worth"):
+            prev = by_user[name].shift()
+            df[f"{name}_growth"] = ((df[name] - prev) / prev.abs()).where(prev != 0)
+            df[f"{name}_ema"] = (
+                by_user[name].ewm(alpha=EMA_ALPHA, adjust=False).mean().reset_index(level=0, drop=True)
+            )
+        for name, streak in STREAK_INDICATORS.items():
+            raised = by_user[name].diff() > 0
+            # Every save that didn't raise the count starts a new run
+            run = (~raised).cumsum()
+            df[streak] = raised.astype("int64").groupby(run).cumsum()
+        df["saves"] = by_user.cumcount() + 1
+        latest = by_user.tail(1).rename(columns={"ts": "last_ts"})
+        latest = latest.astype(object).where(latest.notna(), None)
+        self._write(conn, latest[["username", *STATE_COLUMNS]].values.tolist())
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # READS
+    # ──────────────────────────────────────────────────────────────────────────
+    def get(self, username):
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT * FROM derived_metrics WHERE username = ?", [username]).fetchone()
+        return dict(row) if row is not None else None
+
+    def leaders(self, column, k=10):
+        """Top `k` users by a precomputed column, as (username, value), best first."""
+        if column not in LEADER_METRICS:
+            raise ValueError(f"Unknown leader metric: {column!r}")
+        with self.pool.connection() as conn:
+            return [
+                (row[0], row[1])
+                for row in conn.execute(
+                    f"SELECT username, {column} FROM derived_metrics WHERE {column} > 0 ORDER BY {column} DESC LIMIT ?",
+                    [k],
+                )
+            ]
+
+    def rename_user(self, old_username, new_username):
+        with self.pool.transaction() as conn:
+            self.rename_user_in(conn, old_username, new_username)
+
+    def rename_user_in(self, conn, old_username, new_username):
+        """rename_user() inside the caller's transaction (see ProfileStore.rename())."""
+        conn.execute("UPDATE derived_metrics SET username = ? WHERE username = ?", [new_username, old_username])
+
+
+if __name__ == "__main__":
+    # Batch job, e.g. after a migration or a change to the formulas:
+    #   python -m upright.derived_metrics
+    print(f"Recomputed derived metrics for {DerivedMetrics().recompute()} users")
@@ -0,0 +1,40 @@
+# ──────────────────────────────────────────────────────────────────────────────
+# LARGEST-TRIANGLE-THREE-BUCKETS DOWNSAMPLING
+#
+# Reduces a series to a fixed point budget while keeping its visual shape:
+# the first and last points are always kept, and from each of the
+# `budget - 2` equal-width buckets in between we keep the point that forms
+# the largest triangle with the previously kept point and the average of
+# the next bucket. Peaks and dips therefore survive, unlike with striding
+# or averaging. numpy is imported lazily (it comes with pandas).
+# ──────────────────────────────────────────────────────────────────────────────
+
+
+def lttb_indices(x, y, budget):
+    """Indices of the points LTTB keeps from (x, y); all of them if len <= budget."""
+    import numpy as np
+
+    n = len(x)
+    if budget >= n or n <= 2:
+        return np.arange(n)
+    if budget < 3:
+        raise ValueError("An LTTB point budget must be at least 3")
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    # Bucket boundaries over the interior points 1 .. n-2
+    edges = np.linspace(1, n - 1, budget - 1).astype(np.int64)
+    keep = np.empty(budget, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(budget - 2):
+        start, end = edges[i], edges[i + 1]
+        # Average of the next bucket (the last point for the final bucket)
+        next_start, next_end = end, (edges[i + 2] if i + 2 < len(edges) else n)
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        # Twice the triangle area for every candidate in this bucket
+        areas = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(areas.argmax())
+        keep[i + 1] = a
+    return keep
@@ -0,0 +1,228 @@
+import os
+import threading
+import time
+from bisect import bisect_left, insort
+
+# ──────────────────────────────────────────────────────────────────────────────
+# EXPLORE INDEXES
+#
+# Trending: each indicator save is scored by how much the user improved
+# since their previous save. The score is blended with an exponentially
+# decayed older score, so recent progress counts most. Scores live in a
+# sorted index, which means a save costs one O(log n) search plus an
+# insertion, and reading the top K is a slice. Nothing scans every user on
+# a page view.
+#
+# Trending state is seeded from each user's last TREND_SEED_SAVES saves at
+# startup (older saves have decayed to almost nothing) and re-seeded every
+# TREND_RESEED_SECONDS, so a restart doesn't blank the list and every worker
+# process converges on the same ranking.
+#
+# Search: a sorted list of (token, username) pairs built from lower-cased
+# usernames and full-name words. A prefix query is a bisect to the first
+# matching token and a short walk forward; extra query words filter those
+# matches by their tokens. The list is rebuilt from the profile store with
+# one sort at startup and on every re-seed, which is how profiles created
+# on other workers become searchable.
+# ──────────────────────────────────────────────────────────────────────────────
+
+# indicator -> (weight, relative); relative growth is used for money values
+TREND_WEIGHTS = {
+    "net_worth": (10.0, True),
+    "books_read": (1.0, False),
+    "projects_finished": (2.0, False),
+}
+TREND_DECAY = 0.5
+TREND_SEED_SAVES = 12  # 0.5**12: what older saves would add is below rounding
+TREND_RESEED_SECONDS = float(os.environ.get("UPRIGHT_TREND_RESEED_SECONDS", "300"))
+DEFAULT_TOP_K = 10
+
+
+def improvement_score(previous, current):
+    score = 0.0
+    for name, (weight, relative) in TREND_WEIGHTS.items():
+        delta = float(current[name]) - float(previous[name])
+        if relative:
+            delta /= max(abs(float(previous[name])), 1.0)
+        score += weight * delta
+    return score
+
+
+def _advance_score(last_values, scores, username, current):
+    # One save's step of the decayed score; returns the new score, or None on
+    # a user's first save (nothing to compare against yet)
+    previous = last_values.get(username)
+    last_values[username] = current
+    if previous is None:
+        return None
+    score = improvement_score(previous, current)
+    if username in scores:
+        score += TREND_DECAY * scores[username]
+    scores[username] = score
+    return score
+
+
+def tokenize(username, full_name):
+    return {username.lower(), *full_name.lower().split()}
+
+
+class ExploreIndex:
+    """Trending ranking and profile search shared by all sessions."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._full_names = {}
+        # Trending
+        self._last_values = {}
+        self._scores = {}
+        self._ranked = []  # sorted (-score, username)
+        # Search
+        self._tokens = {}
+        self._entries = []  # sorted (token, username)
+        self._changed = None  # username -> full name (None: removed) while a rebuild reads the store
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # PROFILES
+    # ──────────────────────────────────────────────────────────────────────────
+    def index_profile(self, username, full_name):
+        with self._lock:
+            self._unindex_tokens(username)
+            self._full_names[username] = full_name
+            tokens = tokenize(username, full_name)
+            self._tokens[username] = tokens
+            for token in tokens:
+                insort(self._entries, (token, username))
+            if self._changed is not None:
+                self._changed[username] = full_name
+
+    def index_profiles(self, profiles):
+        """Replace the search index with `profiles`, an iterable of (username, full_name)."""
+        with self._lock:
+            self._changed = {}
+        try:
+            full_names = dict(profiles)
+        finally:
+            with self._lock:
+                changed, self._changed = self._changed, None
+        # Edits made while the store was read are newer than what it returned
+        for username, full_name in changed.items():
+            if full_name is None:
+                full_names.pop(username, None)
+            else:
+                full_names[username] = full_name
+        tokens = {username: tokenize(username, full_name) for username, full_name in full_names.items()}
+        entries = sorted((token, username) for username, words in tokens.items() for token in words)
+        with self._lock:
+            self._full_names, self._tokens, self._entries = full_names, tokens, entries
+        return len(full_names)
+
+    def rename_profile(self, old_username, new_username, full_name):
+        # Trending state follows the user to their new name
+        with self._lock:
+            self._unindex_tokens(old_username)
+            self._full_names.pop(old_username, None)
+            if self._changed is not None:
+                self._changed[old_username] = None
+            if old_username in self._last_values:
+                self._last_values[new_username] = self._last_values.pop(old_username)
+            if old_username in self._scores:
+                score = self._scores.pop(old_username)
+                self._remove_ranked(old_username, score)
+                self._set_score(new_username, score)
+        self.index_profile(new_username, full_name)
+
+    def full_name(self, username):
+        return self._full_names.get(username, "")
+
+    def _unindex_tokens(self, username):
+        for token in self._tokens.pop(username, ()):
+            i = bisect_left(self._entries, (token, username))
+            if i < len(self._entries) and self._entries[i] == (token, username):
+                del self._entries[i]
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # TRENDING
+    # ──────────────────────────────────────────────────────────────────────────
+    def record_save(self, username, indicators):
+        """Update `username`'s trending score from a new indicator save."""
+        current = {name: float(indicators[name]) for name in TREND_WEIGHTS}
+        with self._lock:
+            old_score = self._scores.get(username)
+            score = _advance_score(self._last_values, self._scores, username, current)
+            if score is not None:
+                if old_score is not None:
+                    self._remove_ranked(username, old_score)
+                insort(self._ranked, (-score, username))
+
+    def seed_trending(self, store, saves_per_user=TREND_SEED_SAVES):
+        """Rebuild trending from stored history (see IndicatorStore.iter_recent_saves)."""
+        last_values, scores = {}, {}
+        for username, values in store.iter_recent_saves(saves_per_user, columns=tuple(TREND_WEIGHTS)):
+            _advance_score(last_values, scores, username, values)
+        ranked = sorted((-score, username) for username, score in scores.items())
+        with self._lock:
+            self._last_values, self._scores, self._ranked = last_values, scores, ranked
+        return len(last_values)
+
+    def keep_seeded(self, store, profiles, interval=TREND_RESEED_SECONDS):
+        """Seed trending from `store` and search from the `profiles` store now, then again every `interval` seconds."""
+
+        def reseed():
+            self.index_profiles((profile["username"], profile["full_name"]) for profile in profiles.iter_all())
+            self.seed_trending(store)
+
+        reseed()
+
+        def reseed_forever():
+            while True:
+                time.sleep(interval)
+                try:
+                    reseed()
+                except Exception:
+                    # A busy database only delays the next re-seed
+                    pass
+
+        threading.Thread(target=reseed_forever, name="upright-trending-seed", daemon=True).start()
+
+    def _set_score(self, username, score):
+        self._scores[username] = score
+        insort(self._ranked, (-score, username))
+
+    def _remove_ranked(self, username, score):
+        i = bisect_left(self._ranked, (-score, username))
+        if i < len(self._ranked) and self._ranked[i] == (-score, username):
+            del self._ranked[i]
+
+    def trending(self, k=DEFAULT_TOP_K):
+        """The `k` highest scoring users as (username, full_name, score), best first."""
+        with self._lock:
+            return [
+                (username, self._full_names.get(username, ""), -neg_score)
+                for neg_score, username in self._ranked[:k]
+                if neg_score < 0
+            ]
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # SEARCH
+    # ──────────────────────────────────────────────────────────────────────────
+    def search(self, query, limit=20):
+        """Profiles whose username or name words start with every word of `query`."""
+        words = query.lower().lstrip("@").split()
+        if not words:
+            return []
+        # Walk the matches of the longest (most selective) word, and stop as
+        # soon as `limit` of them also match the other words
+        walked = max(words, key=len)
+        others = [word for word in words if word != walked]
+        matches = set()
+        with self._lock:
+            i = bisect_left(self._entries, (walked, ""))
+            while i < len(self._entries) and len(matches) < limit:
+                token, username = self._entries[i]
+                if not token.startswith(walked):
+                    break
+                tokens = self._tokens[username]
+                if all(any(t.startswith(word) for t in tokens) for word in others):
+                    matches.add(username)
+                i += 1
+            return [(username, self._full_names.get(username, "")) for username in sorted(matches)]
@@ -0,0 +1,375 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from upright.db import ConnectionPool
+
+# ──────────────────────────────────────────────────────────────────────────────
+# FEED ENGINE
+#
+# Timelines are built by fan-out-on-write: publishing a moment pushes its id
+# into the timeline of the author and of every follower. Each timeline is a
+# bounded buffer of increasing post ids, so memory per user is bounded and
+# reading a page is a binary search plus a slice.
+#
+# Posts, follows, reactions, comments and timeline entries live in the
+# shared database; the buffers are a cache of the timeline entries, loaded
+# when a user's feed is first read. Entries written by other worker
+# processes are pulled into cached timelines by id every FEED_SYNC_SECONDS,
+# so every worker serves the same feed. Entries older than a user's newest
+# `timeline_capacity` are deleted per user, one index range at a time.
+#
+# Pagination is cursor-based: a cursor names the last post id already shown
+# and the next page starts strictly below it. Unlike offsets, cursors stay
+# stable while new posts arrive at the head of the timeline.
+# ──────────────────────────────────────────────────────────────────────────────
+
+DEFAULT_TIMELINE_CAPACITY = 1000
+DEFAULT_PAGE_SIZE = 10
+FEED_SYNC_SECONDS = float(os.environ.get("UPRIGHT_FEED_SYNC_SECONDS", "2"))
+
+REACTIONS = ("👍", "🎉", "🔥")
+
+
+@dataclass
+class Comment:
+    author: str
+    text: str
+    created_at: datetime
+
+
+@dataclass
+class Post:
+    post_id: int
+    author: str
+    text: str
+    created_at: datetime
+    reactions: dict = field(default_factory=dict)  # emoji -> set of usernames
+    comments: list = field(default_factory=list)
+
+    def reaction_count(self, emoji):
+        return len(self.reactions.get(emoji, ()))
+
+
+def encode_cursor(post_id):
+    return format(post_id, "x")
+
+
+def decode_cursor(cursor):
+    try:
+        return int(cursor, 16)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid feed cursor: {cursor!r}") from None
+
+
+class Timeline:
+    """Bounded buffer of post ids in increasing order, oldest dropped first."""
+
+    __slots__ = ("capacity", "_ids")
+
+    def __init__(self, capacity=DEFAULT_TIMELINE_CAPACITY):
+        self.capacity = capacity
+        # Grows with the timeline instead of preallocating every slot
+        self._ids = deque(maxlen=capacity)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def ids(self):
+        return list(self._ids)
+
+    def oldest(self):
+        return self._ids[0] if self._ids else None
+
+    def append(self, post_id):
+        self._ids.append(post_id)
+
+    def insert(self, post_id):
+        """Add an id that may be older than the head, e.g. one synced from another worker."""
+        if not self._ids or post_id > self._ids[-1]:
+            self._ids.append(post_id)
+            return
+        i = bisect_left(self._ids, post_id)
+        if (i < len(self._ids) and self._ids[i] == post_id) or (i == 0 and len(self._ids) == self.capacity):
+            # Already there, or older than everything a full buffer keeps
+            return
+        if len(self._ids) == self.capacity:
+            self._ids.popleft()
+            i -= 1
+        self._ids.insert(i, post_id)
+
+    def replace(self, ids):
+        """Reset the buffer to the newest `capacity` of the sorted `ids`."""
+        self._ids = deque(ids[-self.capacity:], maxlen=self.capacity)
+
+    def newest_before(self, before_id, limit):
+        """Up to `limit` ids strictly below `before_id` (None = from the head), newest first."""
+        hi = len(self._ids) if before_id is None else bisect_left(self._ids, before_id)
+        return [self._ids[i] for i in range(hi - 1, max(hi - limit, 0) - 1, -1)]
+
+
+class FeedEngine:
+    """Feed store shared by all sessions and worker processes."""
+
+    def __init__(
+        self, pool=None, path=None, timeline_capacity=DEFAULT_TIMELINE_CAPACITY, sync_interval=FEED_SYNC_SECONDS
+    ):
+        self.pool = pool if pool is not None else ConnectionPool(path)
+        self.timeline_capacity = timeline_capacity
+        self.sync_interval = sync_interval
+        self._lock = threading.Lock()
+        self._timelines = {}  # username -> Timeline, for users whose feed was read
+        self._create_schema()
+        with self.pool.connection() as conn:
+            self._timeline_mark = conn.execute("SELECT COALESCE(MAX(entry_id), 0) FROM feed_timeline").fetchone()[0]
+        self._synced_at = time.monotonic()
+
+    def _create_schema(self):
+        with self.pool.connection() as conn:
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS feed_posts (
+                    post_id INTEGER PRIMARY KEY,
+                    author TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    created_at TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_feed_posts_author ON feed_posts (author, post_id);
+                CREATE TABLE IF NOT EXISTS feed_timeline (
+                    entry_id INTEGER PRIMARY KEY,
+                    username TEXT NOT NULL,
+                    post_id INTEGER NOT NULL,
+                    UNIQUE (username, post_id)
+                );
+                CREATE TABLE IF NOT EXISTS feed_follows (
+                    follower TEXT NOT NULL,
+                    followee TEXT NOT NULL,
+                    PRIMARY KEY (follower, followee)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS idx_feed_follows_followee ON feed_follows (followee);
+                CREATE TABLE IF NOT EXISTS feed_reactions (
+                    post_id INTEGER NOT NULL,
+                    emoji TEXT NOT NULL,
+                    username TEXT NOT NULL,
+                    PRIMARY KEY (post_id, emoji, username)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS feed_comments (
+                    comment_id INTEGER PRIMARY KEY,
+                    post_id INTEGER NOT NULL,
+                    author TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    created_at TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_feed_comments_post ON feed_comments (post_id, comment_id);
+                """
+            )
+
+    def _timeline(self, username, conn=None):
+        # Cache misses (a first read, or a user dropped by a rename) load from the database
+        timeline = self._timelines.get(username)
+        if timeline is None:
+            timeline = self._timelines[username] = Timeline(self.timeline_capacity)
+            if conn is not None:
+                timeline.replace(self._stored_ids(conn, username))
+            else:
+                with self.pool.connection() as conn:
+                    timeline.replace(self._stored_ids(conn, username))
+        return timeline
+
+    def _stored_ids(self, conn, username):
+        rows = conn.execute(
+            "SELECT post_id FROM feed_timeline WHERE username = ? ORDER BY post_id DESC LIMIT ?",
+            [username, self.timeline_capacity + 1],
+        ).fetchall()
+        if len(rows) > self.timeline_capacity:
+            # Entries that fell out of the buffer while it wasn't cached
+            conn.execute("DELETE FROM feed_timeline WHERE username = ? AND post_id <= ?", [username, rows[-1][0]])
+            rows.pop()
+        return [row[0] for row in reversed(rows)]
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # CACHE
+    # ──────────────────────────────────────────────────────────────────────────
+    def sync(self):
+        """Pull timeline entries other workers wrote since the last sync."""
+        with self._lock:
+            with self.pool.connection() as conn:
+                rows = conn.execute(
+                    "SELECT entry_id, username, post_id FROM feed_timeline WHERE entry_id > ? ORDER BY entry_id",
+                    [self._timeline_mark],
+                ).fetchall()
+            for entry_id, username, post_id in rows:
+                timeline = self._timelines.get(username)
+                if timeline is not None:
+                    # Uncached users load everything on their next read anyway
+                    timeline.insert(post_id)
+                self._timeline_mark = entry_id
+            self._synced_at = time.monotonic()
+
+    def _maybe_sync(self):
+        if time.monotonic() - self._synced_at >= self.sync_interval:
+            self.sync()
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # SOCIAL GRAPH
+    # ──────────────────────────────────────────────────────────────────────────
+    def follow(self, follower, followee):
+        if follower == followee:
+            return
+        with self._lock, self.pool.transaction() as conn:
+            added = conn.execute(
+                "INSERT OR IGNORE INTO feed_follows (follower, followee) VALUES (?, ?)", [follower, followee]
+            ).rowcount
+            if not added:
+                return
+            # Backfill: merge the followee's recent posts into the follower's timeline
+            recent = [
+                row[0]
+                for row in conn.execute(
+                    "SELECT post_id FROM feed_posts WHERE author = ? ORDER BY post_id DESC LIMIT ?",
+                    [followee, self.timeline_capacity],
+                )
+            ]
+            if recent:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO feed_timeline (username, post_id) VALUES (?, ?)",
+                    [(follower, post_id) for post_id in recent],
+                )
+                timeline = self._timeline(follower, conn)
+                timeline.replace(sorted(set(timeline.ids()).union(recent)))
+
+    def unfollow(self, follower, followee):
+        with self.pool.transaction() as conn:
+            conn.execute("DELETE FROM feed_follows WHERE follower = ? AND followee = ?", [follower, followee])
+
+    def rename_user(self, old_username, new_username):
+        """Move timelines, graph edges, posts, reactions and comments to a new username."""
+        with self.pool.transaction() as conn:
+            self.rename_user_in(conn, old_username, new_username)
+
+    def rename_user_in(self, conn, old_username, new_username):
+        """rename_user() inside the caller's transaction (see ProfileStore.rename())."""
+        with self._lock:
+            for table, column in (
+                ("feed_posts", "author"),
+                ("feed_timeline", "username"),
+                ("feed_follows", "follower"),
+                ("feed_follows", "followee"),
+                ("feed_reactions", "username"),
+                ("feed_comments", "author"),
+            ):
+                conn.execute(f"UPDATE {table} SET {column} = ? WHERE {column} = ?", [new_username, old_username])
+            # Both timelines reload from the database on their next read, so the
+            # cache is right whether the caller's transaction commits or not
+            self._timelines.pop(old_username, None)
+            self._timelines.pop(new_username, None)
+
+    def is_following(self, follower, followee):
+        with self.pool.connection() as conn:
+            return conn.execute(
+                "SELECT 1 FROM feed_follows WHERE follower = ? AND followee = ?", [follower, followee]
+            ).fetchone() is not None
+
+    def follower_count(self, username):
+        with self.pool.connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM feed_follows WHERE followee = ?", [username]).fetchone()[0]
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # WRITES
+    # ──────────────────────────────────────────────────────────────────────────
+    def publish(self, author, text):
+        """Create a moment and fan it out to the author's and followers' timelines."""
+        created_at = datetime.now()
+        with self._lock, self.pool.transaction() as conn:
+            post_id = conn.execute(
+                "INSERT INTO feed_posts (author, text, created_at) VALUES (?, ?, ?)",
+                [author, text, created_at.isoformat(timespec="seconds")],
+            ).lastrowid
+            followers = conn.execute("SELECT follower FROM feed_follows WHERE followee = ?", [author])
+            recipients = [author, *(row[0] for row in followers)]
+            conn.executemany(
+                "INSERT OR IGNORE INTO feed_timeline (username, post_id) VALUES (?, ?)",
+                [(username, post_id) for username in recipients],
+            )
+            self._timeline(author, conn)
+            full = []
+            for username in recipients:
+                # Followers who haven't read their feed here load it when they do
+                timeline = self._timelines.get(username)
+                if timeline is not None:
+                    timeline.insert(post_id)
+                    if len(timeline) == timeline.capacity:
+                        full.append((username, timeline.oldest()))
+            # The entry that just fell out of a full buffer leaves the table too
+            conn.executemany("DELETE FROM feed_timeline WHERE username = ? AND post_id < ?", full)
+        return Post(post_id, author, text, created_at)
+
+    def toggle_reaction(self, post_id, username, emoji):
+        """Add or remove `username`'s reaction; returns True if the reaction is now set."""
+        with self.pool.transaction() as conn:
+            removed = conn.execute(
+                "DELETE FROM feed_reactions WHERE post_id = ? AND emoji = ? AND username = ?", [post_id, emoji, username]
+            ).rowcount
+            if removed:
+                return False
+            conn.execute("INSERT INTO feed_reactions (post_id, emoji, username) VALUES (?, ?, ?)", [post_id, emoji, username])
+            return True
+
+    def add_comment(self, post_id, username, text):
+        comment = Comment(username, text, datetime.now())
+        with self.pool.transaction() as conn:
+            conn.execute(
+                "INSERT INTO feed_comments (post_id, author, text, created_at) VALUES (?, ?, ?, ?)",
+                [post_id, username, text, comment.created_at.isoformat(timespec="seconds")],
+            )
+        return comment
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # READS
+    # ──────────────────────────────────────────────────────────────────────────
+    def get_post(self, post_id):
+        posts = self.get_posts([post_id])
+        return posts[0] if posts else None
+
+    def get_posts(self, post_ids):
+        """Posts with their reactions and comments, in the order of `post_ids` (three queries)."""
+        post_ids = list(post_ids)
+        if not post_ids:
+            return []
+        marks = ", ".join("?" for _ in post_ids)
+        with self.pool.connection() as conn:
+            posts = {
+                row[0]: Post(row[0], row[1], row[2], datetime.fromisoformat(row[3]))
+                for row in conn.execute(
+                    f"SELECT post_id, author, text, created_at FROM feed_posts WHERE post_id IN ({marks})", post_ids
+                )
+            }
+            for post_id, emoji, username in conn.execute(
+                f"SELECT post_id, emoji, username FROM feed_reactions WHERE post_id IN ({marks})", post_ids
+            ):
+                posts[post_id].reactions.setdefault(emoji, set()).add(username)
+            for post_id, author, text, created_at in conn.execute(
+                f"SELECT post_id, author, text, created_at FROM feed_comments WHERE post_id IN ({marks}) ORDER BY comment_id",
+                post_ids,
+            ):
+                posts[post_id].comments.append(Comment(author, text, datetime.fromisoformat(created_at)))
+        return [posts[post_id] for post_id in post_ids if post_id in posts]
+
+    def page(self, username, cursor=None, limit=DEFAULT_PAGE_SIZE):
+        """One page of `username`'s timeline, newest first.
+
+        Returns (posts, next_cursor); next_cursor is None on the last page.
+        """
+        before_id = decode_cursor(cursor) if cursor is not None else None
+        self._maybe_sync()
+        with self._lock:
+            timeline = self._timeline(username)
+            # Fetch one extra id to learn whether another page exists
+            ids = timeline.newest_before(before_id, limit + 1)
+        posts = self.get_posts(ids[:limit])
+        next_cursor = encode_cursor(ids[limit - 1]) if len(ids) > limit else None
+        return posts, next_cursor
@@ -0,0 +1,246 @@
+import io
+import os
+import tempfile
+import time
+from dataclasses import dataclass, field
+
+from upright.db import DEFAULT_DATA_DIR
+from upright.derived_metrics import net_worth
+from upright.indicator_store import NUMERIC_INDICATORS
+from upright.instrumentation import timed
+
+# ──────────────────────────────────────────────────────────────────────────────
+# BULK IMPORT / EXPORT OF INDICATOR HISTORY
+#
+# Files are processed `chunk_rows` rows at a time, so memory stays bounded
+# by the chunk size rather than the file size. Each chunk is validated with
+# vectorized pandas operations and then written in one transaction.
+# Exports page through the store and append each page to a temp file.
+#
+# Formats: CSV, JSON Lines (one object per line; a single JSON array can't
+# be streamed) and Parquet. pandas and pyarrow are imported lazily, as in
+# upright/charts.py.
+# ──────────────────────────────────────────────────────────────────────────────
+
+FORMATS = ("csv", "jsonl", "parquet")
+FORMAT_EXTENSIONS = {".csv": "csv", ".json": "jsonl", ".jsonl": "jsonl", ".ndjson": "jsonl", ".parquet": "parquet"}
+MIME_TYPES = {"csv": "text/csv", "jsonl": "application/x-ndjson", "parquet": "application/vnd.apache.parquet"}
+DEFAULT_CHUNK_ROWS = int(os.environ.get("UPRIGHT_IMPORT_CHUNK_ROWS", "50000"))
+EXPORT_DIR = os.path.join(DEFAULT_DATA_DIR, "exports")
+EXPORT_MAX_AGE_SECONDS = 3600
+
+# Counts that must be whole numbers; everything read must be >= 0.
+# net_worth is derived (assets - debt), so an imported column is ignored.
+INTEGER_INDICATORS = ("books_read", "courses_completed", "projects_finished")
+INPUT_INDICATORS = tuple(name for name in NUMERIC_INDICATORS if name != "net_worth")
+EXPORT_COLUMNS = ("ts", *NUMERIC_INDICATORS, "accolades")
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+@dataclass
+class ImportReport:
+    rows_read: int = 0
+    imported: int = 0
+    duplicates: int = 0
+    rejected: dict = field(default_factory=dict)  # reason -> row count
+
+    @property
+    def rejected_total(self):
+        return sum(self.rejected.values())
+
+
+def detect_format(filename):
+    fmt = FORMAT_EXTENSIONS.get(os.path.splitext(filename)[1].lower())
+    if fmt is None:
+        raise ImportFormatError(f"Unsupported file type {filename!r}; use CSV, JSON Lines or Parquet.")
+    return fmt
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# IMPORT
+# ──────────────────────────────────────────────────────────────────────────────
+def _iter_chunks(source, fmt, chunk_rows):
+    # Yields (DataFrame, fraction of the input consumed so far)
+    import pandas as pd
+
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        parquet = pq.ParquetFile(source)
+        total = parquet.metadata.num_rows or 1
+        done = 0
+        for batch in parquet.iter_batches(batch_size=chunk_rows):
+            done += batch.num_rows
+            yield batch.to_pandas(), done / total
+        return
+
+    size = source.seek(0, io.SEEK_END) or 1
+    source.seek(0)
+    if fmt == "jsonl":
+        # Sniff the first character: a JSON array would have to be parsed whole
+        head = source.read(64).lstrip()
+        source.seek(0)
+        if head[:1] in (b"[", "["):
+            raise ImportFormatError("JSON files must be JSON Lines (one object per line), not a single array.")
+        reader = pd.read_json(source, lines=True, chunksize=chunk_rows, dtype=False)
+    else:
+        reader = pd.read_csv(source, chunksize=chunk_rows)
+    with reader:
+        for chunk in reader:
+            # The readers buffer ahead, so this is an estimate
+            yield chunk, min(source.tell() / size, 1.0)
+
+
+def _validate_chunk(chunk, report):
+    """Vectorized checks on one chunk; returns the valid rows as store tuples."""
+    import pandas as pd
+
+    missing = [name for name in ("ts", *INPUT_INDICATORS) if name not in chunk.columns]
+    if missing:
+        raise ImportFormatError(f"Missing column(s): {', '.join(missing)}")
+
+    # Offsets are normalized to UTC; naive timestamps keep their wall-clock time
+    ts = pd.to_datetime(chunk["ts"], errors="coerce", format="mixed", utc=True).dt.tz_convert(None)
+    values = chunk[list(INPUT_INDICATORS)].apply(pd.to_numeric, errors="coerce")
+    counts = values[list(INTEGER_INDICATORS)]
+
+    checks = {
+        "unparseable timestamp": ts.isna(),
+        "missing or non-numeric value": values.isna().any(axis=1),
+        "negative value": (values < 0).any(axis=1),
+        "non-integer count": (counts != counts.round()).any(axis=1),
+    }
+    bad = pd.Series(False, index=chunk.index)
+    for reason, mask in checks.items():
+        # Each rejected row is reported once, under the first check it fails
+        new = mask & ~bad
+        if new.any():
+            report.rejected[reason] = report.rejected.get(reason, 0) + int(new.sum())
+        bad |= mask
+
+    # Same text form as datetime.isoformat(timespec="seconds")
+    ts_text = pd.Series(ts[~bad].to_numpy().astype("datetime64[s]").astype(str), index=ts[~bad].index)
+    keep = ~ts_text.duplicated(keep="first")
+    report.duplicates += int((~keep).sum())
+    ts_text = ts_text[keep]
+    valid = values.loc[ts_text.index].astype(float)
+    valid["net_worth"] = net_worth(valid["assets"], valid["debt"])
+    if "accolades" in chunk.columns:
+        accolades = chunk.loc[ts_text.index, "accolades"].fillna("").astype(str)
+    else:
+        accolades = pd.Series("", index=ts_text.index)
+    return list(zip(ts_text, *(valid[name] for name in NUMERIC_INDICATORS), accolades))
+
+
+@timed("history_import")
+def import_history(store, username, source, fmt, chunk_rows=DEFAULT_CHUNK_ROWS, progress=None, on_rows=None):
+    """Stream `source` (a binary file object) into `store` for `username`.
+
+    Invalid rows are counted and skipped, as are timestamps already stored or
+    repeated in the file (the first occurrence wins). `progress`, if given, is
+    called with the fraction of the input consumed after each chunk, and
+    `on_rows` with each chunk's inserted rows.
+    """
+    report = ImportReport()
+    for chunk, fraction in _iter_chunks(source, fmt, chunk_rows):
+        report.rows_read += len(chunk)
+        rows = _validate_chunk(chunk, report)
+        inserted = store.import_rows(username, rows)
+        report.imported += len(inserted)
+        report.duplicates += len(rows) - len(inserted)
+        if on_rows is not None and inserted:
+            on_rows(inserted)
+        if progress is not None:
+            progress(fraction)
+    return report
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# EXPORT
+# ──────────────────────────────────────────────────────────────────────────────
+def purge_exports(export_dir=EXPORT_DIR, max_age_seconds=EXPORT_MAX_AGE_SECONDS):
+    # Exports are handed to the browser once; anything older is left over
+    cutoff = time.time() - max_age_seconds
+    for name in os.listdir(export_dir):
+        path = os.path.join(export_dir, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+@timed("history_export")
+def export_history(store, username, fmt, chunk_rows=DEFAULT_CHUNK_ROWS, export_dir=EXPORT_DIR):
+    """Write the full history of `username` to a temp file; returns its path.
+
+    Rows are paged out of the store `chunk_rows` at a time and appended to
+    the file, so only one page is ever held in memory.
+    """
+    import pandas as pd
+
+    if fmt not in FORMATS:
+        raise ImportFormatError(f"Unknown export format: {fmt!r}")
+    os.makedirs(export_dir, exist_ok=True)
+    purge_exports(export_dir)
+    fd, path = tempfile.mkstemp(prefix=f"{username}_", suffix=f".{fmt}", dir=export_dir)
+    writer = None
+    try:
+        with os.fdopen(fd, "wb") as f:
+            first = True
+            for rows in store.iter_history(username, batch_size=chunk_rows):
+                df = pd.DataFrame.from_records(rows, columns=EXPORT_COLUMNS)
+                for name in INTEGER_INDICATORS:
+                    df[name] = df[name].astype("int64")
+                if fmt == "csv":
+                    df.to_csv(f, header=first, index=False)
+                elif fmt == "jsonl":
+                    df.to_json(f, orient="records", lines=True, force_ascii=False)
+                else:
+                    import pyarrow as pa
+                    import pyarrow.parquet as pq
+
+                    table = pa.Table.from_pandas(df, preserve_index=False)
+                    if writer is None:
+                        writer = pq.ParquetWriter(f, table.schema)
+                    writer.write_table(table)
+                first = False
+            if first and fmt == "csv":
+                pd.DataFrame(columns=EXPORT_COLUMNS).to_csv(f, index=False)
+            elif first and fmt == "parquet":
+                pd.DataFrame(columns=EXPORT_COLUMNS).to_parquet(f, index=False)
+            if writer is not None:
+                writer.close()
+                writer = None
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
+
+
+if __name__ == "__main__":
+    # Server-side import for files above the upload limit (.streamlit/config.toml):
+    #   python -m upright.history_io <username> <path>
+    import sys
+
+    from upright.derived_metrics import DerivedMetrics
+    from upright.indicator_store import IndicatorStore
+    from upright.quantiles import CohortPercentiles
+
+    if len(sys.argv) != 3:
+        sys.exit("usage: python -m upright.history_io <username> <path>")
+    username, path = sys.argv[1:]
+    store = IndicatorStore()
+    with open(path, "rb") as source:
+        report = import_history(store, username, source, detect_format(path))
+    DerivedMetrics(store.pool).recompute([username])
+    if report.imported:
+        # Running workers pick up the new base on their next refresh
+        CohortPercentiles(store.pool, rebuild_every=0).rebuild()
+    print(
+        f"Read {report.rows_read} rows: imported {report.imported}, skipped {report.duplicates} duplicates, "
+        f"rejected {report.rejected_total} {report.rejected or ''}"
+    )
@@ -0,0 +1,275 @@
+from datetime import datetime, timedelta
+
+from upright.db import ConnectionPool
+
+# ──────────────────────────────────────────────────────────────────────────────
+# INDICATOR HISTORY STORE
+#
+# Every "Save Indicators" submit appends one timestamped row to
+# `indicator_saves`. In the same transaction the daily / weekly / monthly
+# buckets in `indicator_rollups` are upserted, so charts over long histories
+# read a few hundred rollup rows instead of scanning every raw save.
+# ──────────────────────────────────────────────────────────────────────────────
+
+NUMERIC_INDICATORS = (
+    "income",
+    "assets",
+    "debt",
+    "net_worth",
+    "books_read",
+    "courses_completed",
+    "family_time",
+    "projects_finished",
+)
+
+ROLLUP_PERIODS = ("day", "week", "month")
+
+
+def bucket_start(ts, period):
+    # Start of the rollup bucket containing `ts`, as an ISO date string
+    day = ts.date()
+    if period == "day":
+        return day.isoformat()
+    if period == "week":
+        return (day - timedelta(days=day.weekday())).isoformat()
+    if period == "month":
+        return day.replace(day=1).isoformat()
+    raise ValueError(f"Unknown rollup period: {period!r}")
+
+
+class IndicatorStore:
+    """Append-only SQLite (WAL) store of indicator snapshots with rollups."""
+
+    def __init__(self, pool=None, path=None):
+        # Normally handed the shared pool; a path gives a standalone store (benchmarks, scripts)
+        self.pool = pool if pool is not None else ConnectionPool(path)
+        self._create_schema()
+
+    def _create_schema(self):
+        value_cols = ", ".join(f"{name} REAL NOT NULL" for name in NUMERIC_INDICATORS)
+        with self.pool.connection() as conn:
+            conn.executescript(
+                f"""
+                CREATE TABLE IF NOT EXISTS indicator_saves (
+                    username TEXT NOT NULL,
+                    ts TEXT NOT NULL,
+                    {value_cols},
+                    accolades TEXT NOT NULL DEFAULT ''
+                );
+                CREATE INDEX IF NOT EXISTS idx_saves_user_ts ON indicator_saves (username, ts);
+
+                CREATE TABLE IF NOT EXISTS indicator_rollups (
+                    username TEXT NOT NULL,
+                    period TEXT NOT NULL,
+                    bucket TEXT NOT NULL,
+                    saves INTEGER NOT NULL,
+                    last_ts TEXT NOT NULL,
+                    {value_cols},
+                    PRIMARY KEY (username, period, bucket)
+                ) WITHOUT ROWID;
+                """
+            )
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # WRITES
+    # ──────────────────────────────────────────────────────────────────────────
+    def append(self, username, indicators, ts=None):
+        """Record one indicator snapshot for `username` and update its rollups."""
+        if ts is None:
+            ts = datetime.now()
+        with self.pool.transaction() as conn:
+            return self.insert_snapshot(conn, username, indicators, ts)
+
+    def insert_snapshot(self, conn, username, indicators, ts):
+        """append() inside the caller's transaction (see upright/write_behind.py)."""
+        ts_text = ts.isoformat(timespec="seconds")
+        values = [float(indicators[name]) for name in NUMERIC_INDICATORS]
+        cols = ", ".join(NUMERIC_INDICATORS)
+        marks = ", ".join("?" for _ in NUMERIC_INDICATORS)
+        conn.execute(
+            f"INSERT INTO indicator_saves (username, ts, {cols}, accolades) VALUES (?, ?, {marks}, ?)",
+            [username, ts_text, *values, indicators.get("accolades", "")],
+        )
+        self._upsert_rollups(
+            conn,
+            [[username, period, bucket_start(ts, period), 1, ts_text, *values] for period in ROLLUP_PERIODS],
+        )
+        return ts_text
+
+    def import_rows(self, username, rows):
+        """Bulk-insert snapshots for `username` in one transaction.
+
+        `rows` are (ts_text, *NUMERIC_INDICATORS values, accolades) tuples with
+        ISO second-resolution timestamps. Rows whose timestamp is already stored
+        for the user are skipped; returns the rows actually inserted.
+        """
+        if not rows:
+            return []
+        cols = ", ".join(NUMERIC_INDICATORS)
+        marks = ", ".join("?" for _ in NUMERIC_INDICATORS)
+        timestamps = [row[0] for row in rows]
+
+        with self.pool.transaction() as conn:
+            existing = {
+                r[0]
+                for r in conn.execute(
+                    "SELECT ts FROM indicator_saves WHERE username = ? AND ts BETWEEN ? AND ?",
+                    [username, min(timestamps), max(timestamps)],
+                )
+            }
+            new_rows = [row for row in rows if row[0] not in existing]
+            conn.executemany(
+                f"INSERT INTO indicator_saves (username, ts, {cols}, accolades) VALUES (?, ?, {marks}, ?)",
+                [[username, *row] for row in new_rows],
+            )
+            # Fold the batch into one upsert per bucket: a count plus its latest
+            # row. Rows are grouped by day first, so bucket_start() runs per day.
+            days = {}
+            for row in new_rows:
+                day = row[0][:10]
+                count, latest = days.get(day, (0, row))
+                days[day] = (count + 1, row if row[0] >= latest[0] else latest)
+            buckets = {}
+            for day, (day_count, day_latest) in days.items():
+                ts = datetime.fromisoformat(day)
+                for period in ROLLUP_PERIODS:
+                    key = (period, bucket_start(ts, period))
+                    count, latest = buckets.get(key, (0, day_latest))
+                    buckets[key] = (count + day_count, day_latest if day_latest[0] >= latest[0] else latest)
+            self._upsert_rollups(
+                conn,
+                [
+                    [username, period, bucket, count, latest[0], *latest[1:-1]]
+                    for (period, bucket), (count, latest) in buckets.items()
+                ],
+            )
+        return new_rows
+
+    def _upsert_rollups(self, conn, params):
+        # params: [username, period, bucket, saves, last_ts, *values] per bucket.
+        # A rollup bucket keeps the latest snapshot that falls inside it.
+        cols = ", ".join(NUMERIC_INDICATORS)
+        marks = ", ".join("?" for _ in NUMERIC_INDICATORS)
+        updates = ", ".join(
+            f"{name} = CASE WHEN excluded.last_ts >= indicator_rollups.last_ts "
+            f"THEN excluded.{name} ELSE indicator_rollups.{name} END"
+            for name in NUMERIC_INDICATORS
+        )
+        conn.executemany(
+            f"""
+            INSERT INTO indicator_rollups (username, period, bucket, saves, last_ts, {cols})
+            VALUES (?, ?, ?, ?, ?, {marks})
+            ON CONFLICT (username, period, bucket) DO UPDATE SET
+                {updates},
+                saves = saves + excluded.saves,
+                last_ts = MAX(last_ts, excluded.last_ts)
+            """,
+            params,
+        )
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # READS
+    # ──────────────────────────────────────────────────────────────────────────
+    def history(self, username, start=None, end=None):
+        """Raw saves for `username` with start <= ts < end, oldest first."""
+        sql = "SELECT * FROM indicator_saves WHERE username = ?"
+        params = [username]
+        if start is not None:
+            sql += " AND ts >= ?"
+            params.append(start.isoformat(timespec="seconds"))
+        if end is not None:
+            sql += " AND ts < ?"
+            params.append(end.isoformat(timespec="seconds"))
+        sql += " ORDER BY ts"
+        with self.pool.connection() as conn:
+            return [dict(row) for row in conn.execute(sql, params)]
+
+    def rollups(self, username, period="day", start=None, end=None):
+        """Pre-aggregated buckets for `username`, oldest first."""
+        if period not in ROLLUP_PERIODS:
+            raise ValueError(f"Unknown rollup period: {period!r}")
+        sql = "SELECT * FROM indicator_rollups WHERE username = ? AND period = ?"
+        params = [username, period]
+        if start is not None:
+            sql += " AND bucket >= ?"
+            params.append(bucket_start(start, period))
+        if end is not None:
+            sql += " AND bucket < ?"
+            params.append(end.date().isoformat())
+        sql += " ORDER BY bucket"
+        with self.pool.connection() as conn:
+            return [dict(row) for row in conn.execute(sql, params)]
+
+    def iter_history(self, username, batch_size=5000):
+        """Yield all raw saves for `username`, oldest first, `batch_size` rows at a time."""
+        last_ts, last_rowid = "", -1
+        while True:
+            with self.pool.connection() as conn:
+                rows = conn.execute(
+                    "SELECT rowid, * FROM indicator_saves WHERE username = ? AND (ts, rowid) > (?, ?) "
+                    "ORDER BY ts, rowid LIMIT ?",
+                    [username, last_ts, last_rowid, batch_size],
+                ).fetchall()
+            if not rows:
+                return
+            last_ts, last_rowid = rows[-1]["ts"], rows[-1]["rowid"]
+            yield [dict(row) for row in rows]
+
+    def time_bounds(self, username):
+        """(first ts, last ts) saved for `username`, or None if nothing was saved yet."""
+        with self.pool.connection() as conn:
+            first, last = conn.execute(
+                "SELECT MIN(ts), MAX(ts) FROM indicator_saves WHERE username = ?", [username]
+            ).fetchone()
+        return None if first is None else (datetime.fromisoformat(first), datetime.fromisoformat(last))
+
+    def count_saves(self, username, start=None, end=None):
+        """Number of raw saves for `username` with start <= ts < end (an index range count)."""
+        sql = "SELECT COUNT(*) FROM indicator_saves WHERE username = ?"
+        params = [username]
+        if start is not None:
+            sql += " AND ts >= ?"
+            params.append(start.isoformat(timespec="seconds"))
+        if end is not None:
+            sql += " AND ts < ?"
+            params.append(end.isoformat(timespec="seconds"))
+        with self.pool.connection() as conn:
+            return conn.execute(sql, params).fetchone()[0]
+
+    def iter_recent_saves(self, per_user, columns=NUMERIC_INDICATORS, batch_size=5000):
+        """Yield (username, {column: value}) for each user's last `per_user` saves, oldest first per user."""
+        cols = ", ".join(columns)
+        with self.pool.connection() as conn:
+            cursor = conn.execute(
+                f"""
+                SELECT username, {cols} FROM (
+                    SELECT username, ts, rowid AS save_id, {cols},
+                           ROW_NUMBER() OVER (PARTITION BY username ORDER BY ts DESC, rowid DESC) AS recency
+                    FROM indicator_saves
+                )
+                WHERE recency <= ? ORDER BY username, ts, save_id
+                """,
+                [per_user],
+            )
+            while rows := cursor.fetchmany(batch_size):
+                for row in rows:
+                    yield row[0], dict(zip(columns, row[1:]))
+
+    def latest(self, username):
+        """Most recent snapshot for `username`, or None if nothing was saved yet."""
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                "SELECT * FROM indicator_saves WHERE username = ? ORDER BY ts DESC, rowid DESC LIMIT 1",
+                [username],
+            ).fetchone()
+        return dict(row) if row is not None else None
+
+    def rename_user(self, old_username, new_username):
+        """Move all history and rollups to a new username."""
+        with self.pool.transaction() as conn:
+            self.rename_user_in(conn, old_username, new_username)
+
+    def rename_user_in(self, conn, old_username, new_username):
+        """rename_user() inside the caller's transaction (see ProfileStore.rename())."""
+        conn.execute("UPDATE indicator_saves SET username = ? WHERE username = ?", [new_username, old_username])
+        conn.execute("UPDATE indicator_rollups SET username = ? WHERE username = ?", [new_username, old_username])
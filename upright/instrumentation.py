@@ -0,0 +1,247 @@
+import atexit
+import functools
+import json
+import os
+import re
+import sys
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime
+
+from upright.db import DEFAULT_DATA_DIR
+
+# ──────────────────────────────────────────────────────────────────────────────
+# HOT-PATH INSTRUMENTATION
+#
+# `timed("stage")` wraps a function or a `with` block and records its wall
+# time into a fixed-bucket histogram. Recording is a perf_counter pair, a
+# bisect and a few integer adds under a lock, which is cheap enough to leave
+# on all the time. A daemon thread periodically writes every histogram to
+# METRICS_PATH, either in Prometheus text format (for a node_exporter
+# textfile collector) or as JSON lines.
+# ──────────────────────────────────────────────────────────────────────────────
+
+METRICS_FORMAT = os.environ.get("UPRIGHT_METRICS_FORMAT", "prom")  # "prom" or "jsonl"
+METRICS_PATH = os.environ.get(
+    "UPRIGHT_METRICS_PATH",
+    os.path.join(DEFAULT_DATA_DIR, "metrics.prom" if METRICS_FORMAT == "prom" else "metrics.jsonl"),
+)
+EXPORT_INTERVAL_SECONDS = float(os.environ.get("UPRIGHT_METRICS_INTERVAL", "15"))
+
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+COUNT_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+BYTES_BUCKETS = (1 << 10, 4 << 10, 16 << 10, 64 << 10, 256 << 10, 1 << 20, 4 << 20, 16 << 20, 64 << 20)
+
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "total", "count")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Named histograms grouped by metric family and a single label value."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._families = {}  # metric -> (help, label, bounds, {label_value: Histogram})
+
+    def register(self, metric, help_text, label, bounds):
+        with self._lock:
+            self._families.setdefault(metric, (help_text, label, bounds, {}))
+
+    def observe(self, metric, label_value, value):
+        with self._lock:
+            _, _, bounds, series = self._families[metric]
+            hist = series.get(label_value)
+            if hist is None:
+                hist = series[label_value] = Histogram(bounds)
+            hist.observe(value)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                metric: (help_text, label, bounds, {k: (list(h.counts), h.total, h.count) for k, h in series.items()})
+                for metric, (help_text, label, bounds, series) in self._families.items()
+            }
+
+
+registry = MetricsRegistry()
+registry.register("upright_stage_duration_seconds", "Wall time of app sections and hot-path stages.", "stage", DURATION_BUCKETS)
+registry.register("upright_session_state_bytes", "Approximate size of one session's st.session_state.", "part", BYTES_BUCKETS)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# TIMING
+# ──────────────────────────────────────────────────────────────────────────────
+class timed:
+    """Time a block (`with timed("stage"):`) or every call of a function (`@timed("stage")`)."""
+
+    __slots__ = ("stage", "_start")
+
+    def __init__(self, stage):
+        self.stage = stage
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        registry.observe("upright_stage_duration_seconds", self.stage, time.perf_counter() - self._start)
+        return False
+
+    def __call__(self, func):
+        stage = self.stage
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                registry.observe("upright_stage_duration_seconds", stage, time.perf_counter() - start)
+
+        return wrapper
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# SESSION STATE SIZE
+# ──────────────────────────────────────────────────────────────────────────────
+def approximate_size(value, _seen=None):
+    """Rough deep size in bytes; binary payloads count at their full length."""
+    if _seen is None:
+        _seen = set()
+    if id(value) in _seen:
+        return 0
+    _seen.add(id(value))
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return sys.getsizeof(value)
+    if hasattr(value, "getbuffer"):
+        # BytesIO, including Streamlit's UploadedFile
+        return value.getbuffer().nbytes
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(approximate_size(k, _seen) + approximate_size(v, _seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(approximate_size(v, _seen) for v in value)
+    elif hasattr(value, "__slots__"):
+        size += sum(approximate_size(getattr(value, s), _seen) for s in value.__slots__ if hasattr(value, s))
+    elif hasattr(value, "__dict__"):
+        size += approximate_size(vars(value), _seen)
+    return size
+
+
+def session_key_label(key):
+    # Keys with ids or rotating generations (edit_photo_3, history_upload_7,
+    # comment_text_42) share one series, so label cardinality stays bounded
+    return re.sub(r"_\d+(?=_|$)", "_n", str(key))
+
+
+def record_session_state_size(session_state, records=None):
+    """Observe the total size of `session_state` (plus the session's vault
+    `records`, if given) and its largest entries."""
+    total = 0
+    if records is not None:
+        total = approximate_size(records)
+        registry.observe("upright_session_state_bytes", "records", total)
+    for key in list(session_state.keys()):
+        try:
+            size = approximate_size(session_state[key])
+        except Exception:
+            # Some widget values can't be read outside their run; skip them
+            continue
+        total += size
+        if size >= BYTES_BUCKETS[2]:
+            registry.observe("upright_session_state_bytes", session_key_label(key), size)
+    registry.observe("upright_session_state_bytes", "total", total)
+    return total
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# EXPORT
+# ──────────────────────────────────────────────────────────────────────────────
+def _format_bound(bound):
+    return repr(bound)
+
+
+def render_prometheus(snapshot):
+    lines = []
+    for metric, (help_text, label, bounds, series) in sorted(snapshot.items()):
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} histogram")
+        for label_value, (counts, total, count) in sorted(series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip((*bounds, None), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound is None else _format_bound(bound)
+                lines.append(f'{metric}_bucket{{{label}="{label_value}",le="{le}"}} {cumulative}')
+            lines.append(f'{metric}_sum{{{label}="{label_value}"}} {total:.9g}')
+            lines.append(f'{metric}_count{{{label}="{label_value}"}} {count}')
+    return "\n".join(lines) + "\n"
+
+
+def render_jsonl(snapshot):
+    ts = datetime.now().isoformat(timespec="seconds")
+    lines = []
+    for metric, (_, label, bounds, series) in sorted(snapshot.items()):
+        for label_value, (counts, total, count) in sorted(series.items()):
+            lines.append(
+                json.dumps(
+                    {"ts": ts, "pid": os.getpid(), "metric": metric, label: label_value, "count": count, "sum": total, "buckets": list(bounds), "counts": counts}
+                )
+            )
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def export_metrics(path=METRICS_PATH, fmt=METRICS_FORMAT):
+    snapshot = registry.snapshot()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if fmt == "jsonl":
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(render_jsonl(snapshot))
+    else:
+        # Replace atomically so a scraper never reads a half-written file
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(render_prometheus(snapshot))
+        os.replace(tmp_path, path)
+
+
+class MetricsExporter:
+    """Daemon thread that exports the registry every `interval` seconds and once at exit."""
+
+    def __init__(self, interval=EXPORT_INTERVAL_SECONDS, path=METRICS_PATH, fmt=METRICS_FORMAT):
+        self.interval = interval
+        self.path = path
+        self.fmt = fmt
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="upright-metrics", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def _export(self):
+        try:
+            export_metrics(self.path, self.fmt)
+        except OSError:
+            # Metrics are best-effort; a full disk must not take the app down
+            pass
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._export()
+
+    def stop(self):
+        if not self._stop.is_set():
+            self._stop.set()
+            self._export()
@@ -0,0 +1,224 @@
+import queue
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+# ──────────────────────────────────────────────────────────────────────────────
+# NOTIFICATIONS
+#
+# Publishers drop events on the bus and return at once. A single dispatcher
+# thread drains them into a broker and then calls any subscribers for the
+# recipient. The broker coalesces bursts: while a notification for the same
+# (recipient, kind, target) is still unread and recent, new events fold
+# into it, so twelve reactions show up as one "12 people reacted" entry.
+# Unread counts are plain per-user integers and read in O(1).
+#
+# InMemoryBroker is the local/test backend. A persistent broker only has to
+# provide the same methods (including rename_user()).
+# ──────────────────────────────────────────────────────────────────────────────
+
+COALESCE_WINDOW = timedelta(minutes=30)
+MAX_NOTIFICATIONS_PER_USER = 200
+
+VERBS = {
+    "reaction": "reacted to your moment",
+    "comment": "commented on your moment",
+    "follow": "started following you",
+}
+
+
+@dataclass
+class Notification:
+    notification_id: int
+    recipient: str
+    kind: str
+    target: object
+    actors: list
+    created_at: datetime
+    updated_at: datetime
+    count: int = 1
+    read: bool = False
+    detail: str = ""
+
+    def message(self):
+        verb = VERBS.get(self.kind, self.kind)
+        if self.count == 1:
+            return f"@{self.actors[0]} {verb}"
+        if len(self.actors) == 1:
+            return f"@{self.actors[0]} {verb} {self.count} times"
+        others = len(self.actors) - 1
+        return f"@{self.actors[-1]} and {others} other{'s' if others > 1 else ''} {verb}"
+
+
+@dataclass
+class Event:
+    recipient: str
+    kind: str
+    actor: str
+    target: object = None
+    detail: str = ""
+    at: datetime = field(default_factory=datetime.now)
+
+
+class InMemoryBroker:
+    """Per-user notification inboxes with burst coalescing and O(1) unread counts."""
+
+    def __init__(self, window=COALESCE_WINDOW, max_per_user=MAX_NOTIFICATIONS_PER_USER):
+        self.window = window
+        self.max_per_user = max_per_user
+        self._lock = threading.Lock()
+        self._next_id = 1
+        self._inboxes = {}  # recipient -> OrderedDict(notification_id -> Notification), oldest first
+        self._open = {}  # (recipient, kind, target) -> unread Notification still accepting events
+        self._unread = {}
+
+    def deliver(self, event):
+        """Store `event`, folding it into an open digest when possible."""
+        key = (event.recipient, event.kind, event.target)
+        with self._lock:
+            inbox = self._inboxes.setdefault(event.recipient, OrderedDict())
+            note = self._open.get(key)
+            if note is not None and not note.read and event.at - note.updated_at <= self.window:
+                note.count += 1
+                if event.actor in note.actors:
+                    note.actors.remove(event.actor)
+                note.actors.append(event.actor)
+                note.updated_at = event.at
+                note.detail = event.detail or note.detail
+                # Keep the inbox ordered by latest activity
+                inbox.move_to_end(note.notification_id)
+                return note
+
+            note = Notification(
+                self._next_id, event.recipient, event.kind, event.target, [event.actor], event.at, event.at, detail=event.detail
+            )
+            self._next_id += 1
+            inbox[note.notification_id] = note
+            self._open[key] = note
+            self._unread[event.recipient] = self._unread.get(event.recipient, 0) + 1
+            while len(inbox) > self.max_per_user:
+                _, dropped = inbox.popitem(last=False)
+                self._forget(dropped)
+            return note
+
+    def _forget(self, note):
+        key = (note.recipient, note.kind, note.target)
+        if self._open.get(key) is note:
+            del self._open[key]
+        if not note.read:
+            self._unread[note.recipient] -= 1
+
+    def unread_count(self, recipient):
+        return self._unread.get(recipient, 0)
+
+    def rename_user(self, old_username, new_username):
+        """Move the inbox and unread count, and rename the user wherever they're an actor."""
+        with self._lock:
+            inbox = self._inboxes.pop(old_username, None)
+            if inbox is not None:
+                self._inboxes[new_username] = inbox
+                for note in inbox.values():
+                    note.recipient = new_username
+            if old_username in self._unread:
+                self._unread[new_username] = self._unread.pop(old_username)
+            self._open = {
+                (new_username if recipient == old_username else recipient, kind, target): note
+                for (recipient, kind, target), note in self._open.items()
+            }
+            for notes in self._inboxes.values():
+                for note in notes.values():
+                    if old_username in note.actors:
+                        note.actors = [new_username if actor == old_username else actor for actor in note.actors]
+
+    def recent(self, recipient, limit=50):
+        """Newest-first notifications for `recipient`."""
+        with self._lock:
+            inbox = self._inboxes.get(recipient)
+            if not inbox:
+                return []
+            notes = []
+            for note in reversed(inbox.values()):
+                notes.append(note)
+                if len(notes) >= limit:
+                    break
+            return notes
+
+    def mark_all_read(self, recipient):
+        with self._lock:
+            for note in self._inboxes.get(recipient, {}).values():
+                if not note.read:
+                    note.read = True
+                    key = (note.recipient, note.kind, note.target)
+                    if self._open.get(key) is note:
+                        del self._open[key]
+            self._unread[recipient] = 0
+
+
+class NotificationBus:
+    """Thread-based publish/subscribe front end for a broker."""
+
+    def __init__(self, broker=None):
+        self.broker = broker if broker is not None else InMemoryBroker()
+        self._queue = queue.Queue()
+        self._subscribers = {}
+        self._subscribers_lock = threading.Lock()
+        self._dispatcher = threading.Thread(target=self._dispatch_forever, name="upright-notifications", daemon=True)
+        self._dispatcher.start()
+
+    def publish(self, recipient, kind, actor, target=None, detail=""):
+        if recipient == actor:
+            # Nobody needs to hear about their own activity
+            return
+        self._queue.put(Event(recipient, kind, actor, target, detail))
+
+    def subscribe(self, recipient, callback):
+        """Call `callback(notification)` on every delivery to `recipient`; returns an unsubscribe function."""
+        with self._subscribers_lock:
+            self._subscribers.setdefault(recipient, []).append(callback)
+
+        def unsubscribe():
+            with self._subscribers_lock:
+                callbacks = self._subscribers.get(recipient, [])
+                if callback in callbacks:
+                    callbacks.remove(callback)
+
+        return unsubscribe
+
+    def flush(self):
+        """Block until every published event has been delivered."""
+        self._queue.join()
+
+    def rename_user(self, old_username, new_username):
+        # Events already published to the old name are delivered first
+        self.flush()
+        self.broker.rename_user(old_username, new_username)
+        with self._subscribers_lock:
+            if old_username in self._subscribers:
+                self._subscribers.setdefault(new_username, []).extend(self._subscribers.pop(old_username))
+
+    def _dispatch_forever(self):
+        while True:
+            event = self._queue.get()
+            try:
+                note = self.broker.deliver(event)
+                with self._subscribers_lock:
+                    callbacks = list(self._subscribers.get(event.recipient, ()))
+                for callback in callbacks:
+                    try:
+                        callback(note)
+                    except Exception:
+                        # A broken subscriber must not stop delivery for everyone else
+                        pass
+            finally:
+                self._queue.task_done()
+
+    # Read-side shortcuts so callers don't need to reach into the broker
+    def unread_count(self, recipient):
+        return self.broker.unread_count(recipient)
+
+    def recent(self, recipient, limit=50):
+        return self.broker.recent(recipient, limit)
+
+    def mark_all_read(self, recipient):
+        self.broker.mark_all_read(recipient)
@@ -0,0 +1,142 @@
+import sqlite3
+from datetime import datetime
+
+# ──────────────────────────────────────────────────────────────────────────────
+# SHARED PROFILE STORE
+#
+# One row per user in the shared database, so every session and browser tab
+# reads the same profile instead of each holding its own copy. Usernames are
+# unique (case-insensitively) through a unique index, and lookups by a list
+# of usernames are batched into a few IN (...) queries.
+# ──────────────────────────────────────────────────────────────────────────────
+
+# Stay well below SQLite's host-parameter limit in batched reads
+BATCH_SIZE = 500
+
+PROFILE_FIELDS = ("user_id", "username", "full_name", "photo_key", "bio", "created_at", "updated_at")
+
+
+class UsernameTaken(ValueError):
+    """Raised when creating or renaming a profile to a username that is in use."""
+
+
+class ProfileStore:
+    def __init__(self, pool):
+        self.pool = pool
+        with self.pool.connection() as conn:
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS profiles (
+                    user_id INTEGER PRIMARY KEY,
+                    username TEXT NOT NULL COLLATE NOCASE,
+                    full_name TEXT NOT NULL,
+                    photo_key TEXT,
+                    bio TEXT NOT NULL DEFAULT '',
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                );
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_profiles_username ON profiles (username);
+                """
+            )
+            # Databases created before the bio moved here from the session
+            if "bio" not in {row["name"] for row in conn.execute("PRAGMA table_info(profiles)")}:
+                conn.execute("ALTER TABLE profiles ADD COLUMN bio TEXT NOT NULL DEFAULT ''")
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # WRITES
+    # ──────────────────────────────────────────────────────────────────────────
+    def create(self, username, full_name, photo_key=None, bio=""):
+        """Insert a profile and return it; raises UsernameTaken on a duplicate."""
+        now = datetime.now().isoformat(timespec="seconds")
+        try:
+            with self.pool.transaction() as conn:
+                cur = conn.execute(
+                    "INSERT INTO profiles (username, full_name, photo_key, bio, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    [username, full_name, photo_key, bio, now, now],
+                )
+                user_id = cur.lastrowid
+        except sqlite3.IntegrityError:
+            raise UsernameTaken(f"The username @{username} is already taken.") from None
+        return {
+            "user_id": user_id,
+            "username": username,
+            "full_name": full_name,
+            "photo_key": photo_key,
+            "bio": bio,
+            "created_at": now,
+            "updated_at": now,
+        }
+
+    def update(self, user_id, **fields):
+        """Update some of username / full_name / photo_key / bio; raises UsernameTaken on a duplicate."""
+        try:
+            with self.pool.transaction() as conn:
+                self.apply_update(conn, user_id, fields)
+        except sqlite3.IntegrityError:
+            raise UsernameTaken(f"The username @{fields['username']} is already taken.") from None
+
+    def rename(self, user_id, new_username, cascade=()):
+        """Change `user_id`'s username and, in the same transaction, call
+        rename_user_in(conn, old, new) on every store in `cascade`.
+
+        Returns the old username; raises UsernameTaken on a duplicate.
+        """
+        try:
+            with self.pool.transaction() as conn:
+                old_username = conn.execute("SELECT username FROM profiles WHERE user_id = ?", [user_id]).fetchone()[0]
+                self.apply_update(conn, user_id, {"username": new_username})
+                for store in cascade:
+                    store.rename_user_in(conn, old_username, new_username)
+        except sqlite3.IntegrityError:
+            raise UsernameTaken(f"The username @{new_username} is already taken.") from None
+        return old_username
+
+    def apply_update(self, conn, user_id, fields):
+        """update() inside the caller's transaction (see upright/write_behind.py)."""
+        unknown = set(fields) - {"username", "full_name", "photo_key", "bio"}
+        if unknown:
+            raise ValueError(f"Unknown profile fields: {sorted(unknown)}")
+        if not fields:
+            return
+        fields = {**fields, "updated_at": datetime.now().isoformat(timespec="seconds")}
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        conn.execute(f"UPDATE profiles SET {assignments} WHERE user_id = ?", [*fields.values(), user_id])
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # READS
+    # ──────────────────────────────────────────────────────────────────────────
+    def get(self, user_id):
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT * FROM profiles WHERE user_id = ?", [user_id]).fetchone()
+        return dict(row) if row is not None else None
+
+    def get_by_username(self, username):
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT * FROM profiles WHERE username = ?", [username]).fetchone()
+        return dict(row) if row is not None else None
+
+    def get_many(self, usernames):
+        """Profiles for `usernames` as {stored username: profile}; unknown names are left out."""
+        wanted = list(dict.fromkeys(usernames))
+        found = {}
+        with self.pool.connection() as conn:
+            for start in range(0, len(wanted), BATCH_SIZE):
+                batch = wanted[start:start + BATCH_SIZE]
+                marks = ", ".join("?" for _ in batch)
+                for row in conn.execute(f"SELECT * FROM profiles WHERE username IN ({marks})", batch):
+                    found[row["username"]] = dict(row)
+        return found
+
+    def iter_all(self, batch_size=BATCH_SIZE):
+        """Every profile, read in keyset-paginated batches."""
+        last_id = 0
+        while True:
+            with self.pool.connection() as conn:
+                rows = conn.execute(
+                    "SELECT * FROM profiles WHERE user_id > ? ORDER BY user_id LIMIT ?", [last_id, batch_size]
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield dict(row)
+            last_id = rows[-1]["user_id"]
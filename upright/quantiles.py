@@ -0,0 +1,337 @@
+import json
+import math
+import os
+import random
+import socket
+import threading
+import time
+import uuid
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from itertools import accumulate
+
+from upright.db import ConnectionPool
+from upright.indicator_store import NUMERIC_INDICATORS
+from upright.instrumentation import timed
+
+# ──────────────────────────────────────────────────────────────────────────────
+# COHORT PERCENTILES (KLL QUANTILE SKETCHES)
+#
+# Each indicator has a KLL sketch of the users' values. A sketch keeps
+# O(k log n) samples in levels, and a sample at level h stands for 2**h
+# values. When a level fills up it is sorted and every other item (random
+# offset) is promoted to the next level. Two sketches merge by
+# concatenating their levels and compacting, which is how sketches from
+# different worker processes are combined.
+#
+# A percentile ranks a value against one value per user. Every
+# REBUILD_SECONDS one worker rebuilds a base sketch per indicator from each
+# user's latest save. It first bumps the epoch, so from then on every
+# process adds the saves it commits to its own delta row of the new epoch,
+# then scans a read snapshot without holding the write lock, and finally
+# swaps in the base and deletes the older deltas, whose saves the snapshot
+# already counted. A frequent saver outweighs others only by the saves
+# since the last rebuild; counts_only_latest() tells whether that applies
+# to a given user. Readers merge the base with the
+# current epoch's deltas, refreshed at most every MERGE_REFRESH_SECONDS,
+# into a sorted (value, cumulative weight) view, so a percentile lookup is
+# one bisect, however many users there are.
+# ──────────────────────────────────────────────────────────────────────────────
+
+SKETCH_K = int(os.environ.get("UPRIGHT_SKETCH_K", "200"))
+MERGE_REFRESH_SECONDS = float(os.environ.get("UPRIGHT_SKETCH_REFRESH_SECONDS", "30"))
+REBUILD_SECONDS = float(os.environ.get("UPRIGHT_SKETCH_REBUILD_SECONDS", "300"))
+MAX_DELTA_RATIO = 0.1
+BASE_WORKER = ""  # worker column of the rebuilt base rows
+REBUILD_MARKER = ""  # indicator column of the row naming the epoch being rebuilt
+REBUILD_STALL_SECONDS = 600  # after this, a rebuild that never finished is taken over
+COMPACTION_RATIO = 2 / 3
+
+
+class KLLSketch:
+    """Mergeable streaming quantile sketch (Karnin, Lang & Liberty, 2016)."""
+
+    def __init__(self, k=SKETCH_K, seed=None):
+        self.k = k
+        self.levels = [[]]
+        self.n = 0
+        self._rng = random.Random(seed)
+
+    def _capacity(self, height):
+        # Lower levels get geometrically smaller buffers; the top level holds k
+        depth = len(self.levels) - height - 1
+        return max(int(math.ceil(self.k * COMPACTION_RATIO**depth)), 2)
+
+    def update(self, value):
+        self.levels[0].append(value)
+        self.n += 1
+        if len(self.levels[0]) >= self._capacity(0):
+            self._compress()
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append([])
+        for level, items in zip(self.levels, other.levels):
+            level.extend(items)
+        self.n += other.n
+        self._compress()
+
+    def _compress(self):
+        # Compact the lowest full level until no level is at capacity
+        while True:
+            for height, level in enumerate(self.levels):
+                if len(level) >= self._capacity(height):
+                    break
+            else:
+                return
+            if height + 1 == len(self.levels):
+                self.levels.append([])
+            level.sort()
+            # An odd item out stays behind, so weight is conserved exactly
+            keep = [level.pop()] if len(level) % 2 else []
+            self.levels[height + 1].extend(level[self._rng.randrange(2)::2])
+            self.levels[height] = keep
+
+    def sorted_view(self):
+        """(values, cumulative weights) over all samples, sorted by value."""
+        weighted = sorted((value, 1 << height) for height, level in enumerate(self.levels) for value in level)
+        return [value for value, _ in weighted], list(accumulate(weight for _, weight in weighted))
+
+    def copy(self):
+        clone = KLLSketch(self.k)
+        clone.levels = [list(level) for level in self.levels]
+        clone.n = self.n
+        return clone
+
+    def to_json(self):
+        return json.dumps({"k": self.k, "n": self.n, "levels": self.levels}, separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, payload):
+        data = json.loads(payload)
+        sketch = cls(data["k"])
+        sketch.levels = data["levels"] or [[]]
+        sketch.n = data["n"]
+        return sketch
+
+
+class PercentileView:
+    """Frozen, sorted view of a sketch answering percentile queries with one bisect."""
+
+    __slots__ = ("values", "cumulative", "total")
+
+    def __init__(self, sketch):
+        self.values, self.cumulative = sketch.sorted_view()
+        self.total = self.cumulative[-1] if self.cumulative else 0
+
+    def percentile(self, value):
+        # Mid-rank, so a value shared by many users (e.g. 0 books) lands in the middle of its tie
+        if not self.total:
+            return None
+        below = bisect_left(self.values, value)
+        at_or_below = bisect_right(self.values, value)
+        weight_below = self.cumulative[below - 1] if below else 0
+        weight_at_or_below = self.cumulative[at_or_below - 1] if at_or_below else 0
+        return 100 * (weight_below + weight_at_or_below) / 2 / self.total
+
+
+class CohortPercentiles:
+    """Per-indicator KLL sketches over each user's latest save, shared across worker processes."""
+
+    def __init__(self, pool=None, path=None, k=SKETCH_K, rebuild_every=REBUILD_SECONDS):
+        self.pool = pool if pool is not None else ConnectionPool(path)
+        self.k = k
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._lock = threading.Lock()
+        self._epoch = 0
+        self._sketches = {name: KLLSketch(k) for name in NUMERIC_INDICATORS}
+        self._views = {}  # indicator -> (PercentileView, built at)
+        self._create_schema()
+        if rebuild_every:
+            threading.Thread(
+                target=self._rebuild_forever, args=(rebuild_every,), name="upright-sketch-rebuild", daemon=True
+            ).start()
+
+    def _create_schema(self):
+        with self.pool.connection() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS cohort_sketches (
+                    indicator TEXT NOT NULL,
+                    worker TEXT NOT NULL,
+                    epoch INTEGER NOT NULL,
+                    n INTEGER NOT NULL,
+                    payload TEXT NOT NULL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (indicator, worker)
+                ) WITHOUT ROWID
+                """
+            )
+
+    def _current_epoch(self, conn):
+        # The epoch new deltas belong to: that of the last base, or of a rebuild in progress
+        return conn.execute("SELECT COALESCE(MAX(epoch), 0) FROM cohort_sketches").fetchone()[0]
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # UPDATES
+    # ──────────────────────────────────────────────────────────────────────────
+    @timed("sketch_update")
+    def record_save(self, indicators):
+        """Add one save's values to every indicator sketch and persist them."""
+        self.record_values({name: (float(indicators[name]),) for name in NUMERIC_INDICATORS})
+
+    def record_values(self, values_by_indicator):
+        """Add many values at once, e.g. {indicator: latest value of each user in a batch}."""
+        with self._lock, self.pool.transaction() as conn:
+            epoch = self._current_epoch(conn)
+            if epoch != self._epoch:
+                # The base was rebuilt from the database, which already holds
+                # everything this delta had seen
+                self._epoch = epoch
+                self._sketches = {name: KLLSketch(self.k) for name in NUMERIC_INDICATORS}
+                self._views.clear()
+            for name, values in values_by_indicator.items():
+                sketch = self._sketches[name]
+                for value in values:
+                    sketch.update(value)
+                # Our own data changed: rebuild this view on the next read
+                self._views.pop(name, None)
+            self._persist(conn, values_by_indicator)
+
+    def _persist(self, conn, names):
+        now = time.time()
+        conn.executemany(
+            "INSERT OR REPLACE INTO cohort_sketches (indicator, worker, epoch, n, payload, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (name, self.worker_id, self._epoch, self._sketches[name].n, self._sketches[name].to_json(), now)
+                for name in names
+            ],
+        )
+
+    def _rebuild_forever(self, interval):
+        while True:
+            time.sleep(min(interval, MERGE_REFRESH_SECONDS))
+            try:
+                self.rebuild(max_age=interval)
+            except Exception:
+                # A busy or missing database only delays the next rebuild
+                pass
+
+    def rebuild(self, max_age=0, batch_size=5000):
+        """Rebuild the base sketches from each user's latest save and drop older deltas.
+
+        Does nothing if another worker rebuilt within `max_age` seconds and the
+        deltas since are under MAX_DELTA_RATIO of the base, or if another
+        rebuild is in progress. Returns the number of users counted, or None
+        if skipped.
+        """
+        with self.pool.transaction() as conn:
+            built_at, base_n, delta_n = conn.execute(
+                """
+                SELECT MAX(CASE WHEN worker = ? THEN updated_at END),
+                       SUM(CASE WHEN worker = ? THEN n ELSE 0 END),
+                       SUM(CASE WHEN worker != ? THEN n ELSE 0 END)
+                FROM cohort_sketches WHERE indicator = ?
+                """,
+                [BASE_WORKER, BASE_WORKER, BASE_WORKER, NUMERIC_INDICATORS[0]],
+            ).fetchone()
+            # Small cohorts drift quickly and are cheap to rebuild, so they are rebuilt early
+            if built_at is not None and time.time() - built_at < max_age and delta_n <= MAX_DELTA_RATIO * base_n:
+                return None
+            marker = conn.execute(
+                "SELECT epoch, updated_at FROM cohort_sketches WHERE indicator = ? AND worker = ?", [REBUILD_MARKER, BASE_WORKER]
+            ).fetchone()
+            if marker is not None and marker[1] > (built_at or 0) and time.time() - marker[1] < REBUILD_STALL_SECONDS:
+                return None
+            # Deltas move to the new epoch now, so saves committed after the
+            # scan's snapshot below are counted there and not lost in the swap
+            epoch = self._current_epoch(conn) + 1
+            conn.execute(
+                "INSERT OR REPLACE INTO cohort_sketches (indicator, worker, epoch, n, payload, updated_at) VALUES (?, ?, ?, 0, '', ?)",
+                [REBUILD_MARKER, BASE_WORKER, epoch, time.time()],
+            )
+        started = time.time()
+
+        # The scan reads a WAL snapshot and holds no write lock
+        sketches = {name: KLLSketch(self.k) for name in NUMERIC_INDICATORS}
+        users = 0
+        with self.pool.connection() as conn:
+            conn.execute("BEGIN")
+            try:
+                # One index seek per user for their latest save (ties go to the later insert)
+                cursor = conn.execute(
+                    f"""
+                    SELECT {', '.join(NUMERIC_INDICATORS)} FROM indicator_saves WHERE rowid IN (
+                        SELECT (
+                            SELECT rowid FROM indicator_saves AS s WHERE s.username = u.username
+                            ORDER BY s.ts DESC, s.rowid DESC LIMIT 1
+                        )
+                        FROM (SELECT DISTINCT username FROM indicator_saves) AS u
+                    )
+                    """
+                )
+                while rows := cursor.fetchmany(batch_size):
+                    for row in rows:
+                        for name, value in zip(NUMERIC_INDICATORS, row):
+                            sketches[name].update(value)
+                    users += len(rows)
+            finally:
+                conn.execute("COMMIT")
+
+        with self.pool.transaction() as conn:
+            if self._current_epoch(conn) != epoch:
+                # Another worker took over a rebuild that looked stalled
+                return None
+            # Older deltas only hold saves the snapshot already counted
+            conn.execute("DELETE FROM cohort_sketches WHERE epoch < ?", [epoch])
+            conn.executemany(
+                "INSERT OR REPLACE INTO cohort_sketches (indicator, worker, epoch, n, payload, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                [(name, BASE_WORKER, epoch, sketch.n, sketch.to_json(), started) for name, sketch in sketches.items()],
+            )
+        with self._lock:
+            if self._epoch < epoch:
+                self._epoch = epoch
+                self._sketches = {name: KLLSketch(self.k) for name in NUMERIC_INDICATORS}
+            self._views.clear()
+        return users
+
+    def counts_only_latest(self, last_save_ts):
+        """True if the sketches hold just one value, the latest, of a user whose last save was at `last_save_ts`.
+
+        A user who saved after the base was built also has an older value in it
+        until the next rebuild, so their percentile would count them twice.
+        """
+        with self.pool.connection() as conn:
+            built_at = conn.execute(
+                "SELECT MAX(updated_at) FROM cohort_sketches WHERE indicator = ? AND worker = ?",
+                [NUMERIC_INDICATORS[0], BASE_WORKER],
+            ).fetchone()[0]
+        return built_at is not None and datetime.fromtimestamp(built_at).isoformat(timespec="seconds") > last_save_ts
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # QUERIES
+    # ──────────────────────────────────────────────────────────────────────────
+    def _view(self, name):
+        now = time.monotonic()
+        with self._lock:
+            cached = self._views.get(name)
+            if cached is not None and now - cached[1] < MERGE_REFRESH_SECONDS:
+                return cached[0]
+        merged = KLLSketch(self.k)
+        with self.pool.connection() as conn:
+            for row in conn.execute(
+                """
+                SELECT payload FROM cohort_sketches
+                WHERE indicator = ? AND epoch = (SELECT MAX(epoch) FROM cohort_sketches WHERE indicator = ? AND worker = ?)
+                """,
+                [name, name, BASE_WORKER],
+            ):
+                merged.merge(KLLSketch.from_json(row[0]))
+        view = PercentileView(merged)
+        with self._lock:
+            self._views[name] = (view, now)
+        return view
+
+    def percentile(self, name, value):
+        """Percentile (0-100) of `value` among users' latest values of indicator `name`, or None."""
+        return self._view(name).percentile(float(value))
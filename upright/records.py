@@ -0,0 +1,46 @@
+from dataclasses import dataclass, field, fields
+
+# ──────────────────────────────────────────────────────────────────────────────
+# SESSION RECORDS
+#
+# Typed, slot-based replacements for the free-form per-session dicts. Slots
+# drop the per-instance __dict__ and fix the attribute set, which keeps each
+# session small and catches typos in field names. Large blobs never live
+# here: avatars are referenced by content hash, profiles by user_id.
+# ──────────────────────────────────────────────────────────────────────────────
+
+
+@dataclass(slots=True)
+class IndicatorRecord:
+    income: float = 0.0
+    assets: float = 0.0
+    debt: float = 0.0
+    net_worth: float = 0.0
+    books_read: int = 0
+    courses_completed: int = 0
+    family_time: float = 0.0  # hours/week
+    projects_finished: int = 0
+    accolades: str = ""
+
+    # Read-only mapping access, so stores and chart builders can take either
+    # a record or a plain dict row
+    def __getitem__(self, name):
+        return getattr(self, name)
+
+    def get(self, name, default=None):
+        return getattr(self, name, default)
+
+    def as_dict(self):
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+
+@dataclass(slots=True)
+class ProfileRecord:
+    user_id: int | None = None
+    username: str = ""
+
+
+@dataclass(slots=True)
+class SessionRecords:
+    profile: ProfileRecord = field(default_factory=ProfileRecord)
+    indicators: IndicatorRecord = field(default_factory=IndicatorRecord)
@@ -0,0 +1,112 @@
+import uuid
+
+import streamlit as st
+
+from upright.db import ConnectionPool
+from upright.derived_metrics import DerivedMetrics
+from upright.explore import ExploreIndex
+from upright.feed import FeedEngine
+from upright.indicator_store import IndicatorStore
+from upright.instrumentation import MetricsExporter
+from upright.notifications import NotificationBus
+from upright.profile_store import ProfileStore
+from upright.quantiles import REBUILD_SECONDS, CohortPercentiles
+from upright.sessions import SessionVault
+from upright.write_behind import WriteBehindQueue
+
+# ──────────────────────────────────────────────────────────────────────────────
+# SHARED RESOURCES (one instance per process, shared by all sessions)
+# ──────────────────────────────────────────────────────────────────────────────
+@st.cache_resource
+def get_db_pool():
+    return ConnectionPool()
+
+
+@st.cache_resource
+def get_indicator_store():
+    return IndicatorStore(get_db_pool())
+
+
+@st.cache_resource
+def get_derived_metrics():
+    metrics = DerivedMetrics(get_db_pool())
+    # Users whose history predates the derived table get their rows now
+    metrics.backfill()
+    return metrics
+
+
+@st.cache_resource
+def get_cohort_percentiles():
+    # Shares the indicator store's pool, which also guarantees indicator_saves exists
+    percentiles = CohortPercentiles(get_indicator_store().pool)
+    # Builds the base sketches unless another worker did so recently
+    percentiles.rebuild(max_age=REBUILD_SECONDS)
+    return percentiles
+
+
+@st.cache_resource
+def get_profile_store():
+    return ProfileStore(get_db_pool())
+
+
+@st.cache_resource
+def get_write_behind():
+    # Replays journals left by a crashed process before taking new saves
+    return WriteBehindQueue(get_indicator_store(), get_derived_metrics(), get_profile_store(), get_cohort_percentiles())
+
+
+@st.cache_resource
+def get_feed_engine():
+    return FeedEngine(get_db_pool())
+
+
+@st.cache_resource
+def get_explore_index():
+    # Search covers every stored profile and trending picks up where the
+    # stored history left off; both are refreshed from the stores periodically
+    index = ExploreIndex()
+    index.keep_seeded(get_indicator_store(), get_profile_store())
+    return index
+
+
+@st.cache_resource
+def get_notification_bus():
+    return NotificationBus()
+
+
+@st.cache_resource
+def get_metrics_exporter():
+    return MetricsExporter()
+
+
+@st.cache_resource
+def get_session_vault():
+    return SessionVault()
+
+
+def current_session():
+    # st.session_state only holds the vault key; the records themselves live
+    # in the vault, which may have spilled them to disk while the tab was idle
+    if "session_key" not in st.session_state:
+        st.session_state.session_key = uuid.uuid4().hex
+    return get_session_vault().checkout(st.session_state.session_key)
+
+
+def current_username():
+    # For run_every fragments: a plain session_state read, because every
+    # checkout counts as activity and a polled tab would never go idle and spill
+    username = st.session_state.get("session_username")
+    if not username:
+        username = current_session().profile.username
+        if username:
+            st.session_state.session_username = username
+    return username
+
+
+def set_current_username(username):
+    current_session().profile.username = username
+    st.session_state.session_username = username
+
+
+# How often open sessions poll their (O(1)) unread counter and inbox
+NOTIFICATION_REFRESH_SECONDS = 10
@@ -0,0 +1,10 @@
+# One module per app section; UpRightApp.py imports each on first use
+import streamlit as st
+
+
+def reset_feed_pages():
+    # Lives here, not in sections/feed.py, because the sidebar's navigation
+    # callback needs it and importing the Feed module would defeat its lazy
+    # load (and its import time in the startup report)
+    st.session_state.feed_post_ids = None
+    st.session_state.feed_cursor = None
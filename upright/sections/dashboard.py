@@ -0,0 +1,411 @@
+import os
+from datetime import datetime, time, timedelta
+
+import streamlit as st
+
+from upright.charts import dashboard_figure, history_figure
+from upright.derived_metrics import EMA_SPAN, net_worth, next_state
+from upright.history_io import FORMATS, INPUT_INDICATORS, MIME_TYPES, detect_format, export_history, import_history
+from upright.indicator_store import bucket_start
+from upright.instrumentation import timed
+from upright.resources import (
+    current_session,
+    get_cohort_percentiles,
+    get_derived_metrics,
+    get_explore_index,
+    get_indicator_store,
+    get_write_behind,
+)
+
+# ──────────────────────────────────────────────────────────────────────────────
+# DASHBOARD (“My Chart”) SECTION
+#
+# The dashboard is split into fragments so a widget interaction reruns only
+# what depends on it:
+#   indicators_form  → a save reruns the form and its nested chart/summary
+#   dashboard_chart  → toggling Bar/Line reruns only the chart
+#   progress_chart   → changing resolution or date range reruns only the history
+#   metrics_summary  → re-rendered only as part of a save
+#   history_transfer → bulk import / export runs without touching the charts
+# ──────────────────────────────────────────────────────────────────────────────
+def show_dashboard():
+    st.title("📊 Dashboard")
+    st.markdown("---")
+    st.write("Update your main indicators below, then view your life as a chart.")
+
+    indicators_form()
+    history_transfer()
+
+    st.markdown("---")
+    st.write("🚀 Keep these numbers up to date to see your progress grow over time!")
+
+
+@st.fragment
+@timed("indicators_form")
+def indicators_form():
+    session = current_session()
+    indicators = session.indicators
+    with st.form(key="indicators_form"):
+        col1, col2, col3 = st.columns(3, gap="large")
+        with col1:
+            income_val = st.number_input(
+                "📈 Income",
+                min_value=0.0,
+                format="%.2f",
+                value=indicators.income,
+                key="income_input",
+            )
+            assets_val = st.number_input(
+                "💼 Assets",
+                min_value=0.0,
+                format="%.2f",
+                value=indicators.assets,
+                key="assets_input",
+            )
+            debt_val = st.number_input(
+                "💳 Debt",
+                min_value=0.0,
+                format="%.2f",
+                value=indicators.debt,
+                key="debt_input",
+            )
+        with col2:
+            # Derived on save from assets and debt (upright/derived_metrics.py);
+            # filled in below so it already shows the value being saved
+            net_worth_slot = st.empty()
+            books_read_val = st.number_input(
+                "📚 Books Read",
+                min_value=0,
+                value=indicators.books_read,
+                step=1,
+                key="books_input",
+            )
+            courses_val = st.number_input(
+                "🎓 Courses Completed",
+                min_value=0,
+                value=indicators.courses_completed,
+                step=1,
+                key="courses_input",
+            )
+        with col3:
+            family_time_val = st.number_input(
+                "👪 Family Time (hrs/week)",
+                min_value=0.0,
+                format="%.1f",
+                value=indicators.family_time,
+                key="family_input",
+            )
+            projects_val = st.number_input(
+                "🚀 Projects Finished",
+                min_value=0,
+                value=indicators.projects_finished,
+                step=1,
+                key="projects_input",
+            )
+            accolades_val = st.text_area(
+                "🏆 Accolades / Short Bio",
+                value=indicators.accolades,
+                key="accolades_input",
+                help="Share new accomplishments or notes",
+            )
+
+        submitted = st.form_submit_button(label="Save Indicators", type="primary")
+        if submitted:
+            # Update session state with new values
+            indicators.income = income_val
+            indicators.assets = assets_val
+            indicators.debt = debt_val
+            indicators.net_worth = net_worth(assets_val, debt_val)
+            indicators.books_read = books_read_val
+            indicators.courses_completed = courses_val
+            indicators.family_time = family_time_val
+            indicators.projects_finished = projects_val
+            if accolades_val != indicators.accolades:
+                # The same bio the profile form edits, stored with the profile
+                get_write_behind().update_profile(session.profile.user_id, bio=accolades_val)
+            indicators.accolades = accolades_val
+            # Queue a timestamped snapshot; the writer thread stores it along
+            # with its derived metrics and percentiles (upright/write_behind.py)
+            get_write_behind().save_indicators(session.profile.username, indicators)
+            get_explore_index().record_save(session.profile.username, indicators)
+            st.success("Indicators saved!")
+        net_worth_slot.metric("🪙 Net Worth", f"{indicators.net_worth:,.2f}", help="Assets − Debt, updated when you save")
+
+    # Rendered after the form, so a save is already reflected without a rerun
+    dashboard_chart()
+    progress_chart()
+    metrics_summary()
+
+
+@st.fragment
+@timed("dashboard_chart")
+def dashboard_chart():
+    st.markdown("---")
+    st.subheader("📈 Your Life as a Chart")
+
+    # Default to Line chart (index=1)
+    chart_type = st.radio(
+        "Select chart style:",
+        ["Bar", "Line"],
+        index=1,
+        horizontal=True,
+        key="dashboard_chart_type",
+    )
+
+    # Figures are memoized on the indicator values + chart style, so an
+    # unchanged dashboard re-renders without rebuilding anything
+    fig = dashboard_figure(current_session().indicators, chart_type)
+    with timed("plotly_chart"):
+        st.plotly_chart(fig, width="stretch")
+
+
+# Most rows fetched for one chart window. "Auto" draws raw saves when the
+# window holds at most this many, else the finest rollup that does; either
+# way the chart is downsampled to its point budget before drawing.
+HISTORY_FETCH_LIMIT = int(os.environ.get("UPRIGHT_CHART_FETCH_LIMIT", "5000"))
+ROLLUP_DAYS = {"day": 1, "week": 7, "month": 30}
+
+
+def _history_rows(username, resolution, start, end):
+    # Returns (rows, x field, resolution actually used)
+    store = get_indicator_store()
+    if resolution == "auto":
+        if store.count_saves(username, start, end) <= HISTORY_FETCH_LIMIT:
+            resolution = "raw"
+        else:
+            span_days = max((end - start).days, 1)
+            resolution = next(
+                (period for period, days in ROLLUP_DAYS.items() if span_days / days <= HISTORY_FETCH_LIMIT), "month"
+            )
+    if resolution == "raw":
+        return store.history(username, start, end), "ts", resolution
+    return store.rollups(username, period=resolution, start=start, end=end), "bucket", resolution
+
+
+def _with_pending(rows, pending, resolution):
+    # Adds a queued snapshot to the committed rows the way the store will
+    # once it commits, unless it already has
+    if resolution == "raw":
+        return rows if rows and rows[-1]["ts"] >= pending["ts"] else [*rows, pending]
+    row = {**pending, "bucket": bucket_start(datetime.fromisoformat(pending["ts"]), resolution), "last_ts": pending["ts"]}
+    if rows and rows[-1]["bucket"] == row["bucket"]:
+        # A bucket shows the latest snapshot inside it
+        return rows if rows[-1]["last_ts"] >= pending["ts"] else [*rows[:-1], {**rows[-1], **row}]
+    return [*rows, row]
+
+
+@st.fragment
+@timed("progress_chart")
+def progress_chart():
+    # Progress over time: zooming in (narrowing the date range) re-queries at
+    # a finer resolution, down to the individual saves
+    st.markdown("---")
+    st.subheader("⏳ Your Progress Over Time")
+    username = current_session().profile.username
+    bounds = get_indicator_store().time_bounds(username)
+    # A save queued by this run is drawn from its pending snapshot rather
+    # than waited for; later reruns read it back from the store
+    pending = get_write_behind().pending_indicators(username)
+    if pending is not None:
+        pending_ts = datetime.fromisoformat(pending["ts"])
+        bounds = (pending_ts, pending_ts) if bounds is None else (min(bounds[0], pending_ts), max(bounds[1], pending_ts))
+    if bounds is None:
+        st.info("Save your indicators to start building your history.")
+        return
+
+    granularity = st.radio(
+        "Group saves by:",
+        ["Auto", "Save", "Day", "Week", "Month"],
+        index=0,
+        horizontal=True,
+        key="dashboard_history_period",
+    )
+    first_day, last_day = bounds[0].date(), bounds[1].date()
+    if first_day < last_day:
+        start_day, end_day = st.slider(
+            "Date range",
+            min_value=first_day,
+            max_value=last_day,
+            value=(first_day, last_day),
+            format="YYYY-MM-DD",
+            key="dashboard_history_range",
+        )
+    else:
+        start_day, end_day = first_day, last_day
+    start = datetime.combine(start_day, time.min)
+    end = datetime.combine(end_day + timedelta(days=1), time.min)
+
+    resolution = "raw" if granularity == "Save" else granularity.lower()
+    rows, x_field, used = _history_rows(username, resolution, start, end)
+    if pending is not None and start <= pending_ts < end:
+        rows = _with_pending(rows, pending, used)
+    if rows:
+        fig = history_figure(rows, x_field)
+        with timed("plotly_chart"):
+            st.plotly_chart(fig, width="stretch")
+        if granularity == "Auto":
+            st.caption(f"Showing {'individual saves' if used == 'raw' else f'{used}ly rollups'} for this range.")
+    else:
+        st.info("No saves in this date range.")
+
+
+@st.fragment
+@timed("metrics_summary")
+def metrics_summary():
+    # Display "Abstract Metrics" summary below the chart
+    st.markdown("---")
+    st.subheader("📋 Summary of Abstract Metrics")
+    session = current_session()
+    indicators = session.indicators
+    # Growth, averages and streaks are precomputed on save. A save that is
+    # still queued is applied to the committed row here, as the writer will,
+    # instead of waiting for it. Percentiles come from the shared quantile
+    # sketches and only mean something after a save
+    derived = get_derived_metrics().get(session.profile.username)
+    pending = get_write_behind().pending_indicators(session.profile.username)
+    if pending is not None and (derived is None or pending["ts"] > derived["last_ts"]):
+        derived = next_state(derived, pending["ts"], pending)
+    derived = derived or {}
+    percentiles = None
+    if derived:
+        percentiles = get_cohort_percentiles()
+        # Until the next rebuild the sketches also hold this user's earlier
+        # values, which would rank them against themselves
+        if pending is not None or not percentiles.counts_only_latest(derived["last_ts"]):
+            percentiles = None
+    st.write(f"**Accolades / Bio:** {indicators.accolades}")
+    col_a, col_b, col_c = st.columns(3, gap="large")
+    with col_a:
+        st.metric(label="Books Read", value=indicators.books_read, delta=_streak_text(derived.get("books_streak")))
+        _percentile_caption(percentiles, "books_read", indicators.books_read)
+    with col_b:
+        st.metric(
+            label="Courses Completed",
+            value=indicators.courses_completed,
+            delta=_streak_text(derived.get("courses_streak")),
+        )
+        _percentile_caption(percentiles, "courses_completed", indicators.courses_completed)
+    with col_c:
+        st.metric(label="Family Time (hrs/week)", value=f"{indicators.family_time:.1f}")
+        _percentile_caption(percentiles, "family_time", indicators.family_time)
+    if derived:
+        col_d, col_e, col_f = st.columns(3, gap="large")
+        with col_d:
+            st.metric(
+                label="Net Worth",
+                value=f"{derived['net_worth']:,.2f}",
+                delta=None if derived["net_worth_growth"] is None else f"{derived['net_worth_growth']:+.1%} since last save",
+            )
+            _percentile_caption(percentiles, "net_worth", derived["net_worth"])
+        with col_e:
+            st.metric(label=f"Income ({EMA_SPAN}-save average)", value=f"{derived['income_ema']:,.2f}")
+            _percentile_caption(percentiles, "income", derived["income"], "latest income")
+        with col_f:
+            st.metric(
+                label="Projects Finished",
+                value=indicators.projects_finished,
+                delta=_streak_text(derived.get("projects_streak")),
+            )
+            _percentile_caption(percentiles, "projects_finished", indicators.projects_finished)
+        if percentiles is None:
+            st.caption("Percentiles against other users update a few minutes after a save.")
+
+
+def _percentile_caption(percentiles, name, value, subject=None):
+    if percentiles is None:
+        return
+    pct = percentiles.percentile(name, value)
+    if pct is not None:
+        rank = round(pct)
+        suffix = "th" if 10 <= rank % 100 <= 20 else {1: "st", 2: "nd", 3: "rd"}.get(rank % 10, "th")
+        st.caption(f"{(subject + ': ') if subject else ''}{rank}{suffix} percentile of all users")
+
+
+def _streak_text(streak):
+    return f"{streak}-save streak" if streak else None
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# BULK IMPORT / EXPORT
+# Files are streamed in chunks by upright/history_io.py
+# ──────────────────────────────────────────────────────────────────────────────
+def _read_export(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _history_upload_key():
+    return f"history_upload_{st.session_state.get('history_upload_generation', 0)}"
+
+
+@st.fragment
+@timed("history_transfer")
+def history_transfer():
+    username = current_session().profile.username
+    st.markdown("---")
+    with st.expander("📂 Import / export your history"):
+        st.caption(
+            "CSV, JSON Lines or Parquet with a `ts` column plus "
+            + ", ".join(f"`{name}`" for name in INPUT_INDICATORS)
+            + " (and optionally `accolades`). Net worth is computed from assets and debt;"
+            + " rows already saved for a timestamp are skipped."
+        )
+        upload = st.file_uploader("History file", type=["csv", "json", "jsonl", "ndjson", "parquet"], key=_history_upload_key())
+        if upload is not None and st.button("Import history", type="primary", key="history_import"):
+            bar = st.progress(0.0, text="Importing…")
+            try:
+                report = import_history(
+                    get_indicator_store(),
+                    username,
+                    upload,
+                    detect_format(upload.name),
+                    progress=lambda fraction: bar.progress(fraction, text=f"Importing… {fraction:.0%}"),
+                )
+            except ValueError as exc:
+                # Bad columns or format, or a file pandas/pyarrow can't parse
+                bar.empty()
+                st.error(f"Import failed: {exc}")
+            else:
+                # Imported rows can land anywhere in the history: rebuild this user's metrics
+                get_derived_metrics().recompute([username])
+                if report.imported:
+                    # Percentiles count one value per user: their latest save
+                    get_cohort_percentiles().record_save(get_indicator_store().latest(username))
+                bar.progress(1.0, text="Import finished")
+                st.session_state.history_import_report = report
+                # The file is in the store now; a fresh key drops the uploaded bytes
+                st.session_state.history_upload_generation = st.session_state.get("history_upload_generation", 0) + 1
+                # Full rerun so the progress chart picks up the imported history
+                st.rerun()
+        report = st.session_state.get("history_import_report")
+        if report is not None:
+            st.success(
+                f"Imported {report.imported:,} of {report.rows_read:,} rows "
+                f"({report.duplicates:,} duplicate timestamps skipped)."
+            )
+            for reason, count in report.rejected.items():
+                st.warning(f"{count:,} row(s) rejected: {reason}")
+
+        col1, col2 = st.columns((1, 2))
+        with col1:
+            fmt = st.selectbox("Export format", FORMATS, key="history_export_format")
+            if st.button("Prepare export", key="history_export"):
+                with st.spinner("Writing export…"):
+                    previous = st.session_state.get("history_export_path")
+                    if previous and os.path.exists(previous):
+                        os.remove(previous)
+                    st.session_state.history_export_path = export_history(get_indicator_store(), username, fmt)
+        export_path = st.session_state.get("history_export_path")
+        with col2:
+            if export_path and os.path.exists(export_path):
+                export_fmt = os.path.splitext(export_path)[1][1:]
+                # Deferred: the file is only read when the button is clicked, not
+                # on every rerun. Streamlit still buffers it in memory to serve it.
+                st.download_button(
+                    "Download export",
+                    data=lambda: _read_export(export_path),
+                    file_name=f"{username}_history.{export_fmt}",
+                    mime=MIME_TYPES[export_fmt],
+                    on_click="ignore",
+                    key="history_download",
+                )
@@ -0,0 +1,85 @@
+import streamlit as st
+
+from upright.derived_metrics import LEADER_METRICS
+from upright.instrumentation import timed
+from upright.resources import current_session, get_derived_metrics, get_explore_index, get_feed_engine, get_notification_bus
+
+# ──────────────────────────────────────────────────────────────────────────────
+# EXPLORE SECTION
+# Trending and search read the shared ExploreIndex, which is kept current
+# on every profile change and indicator save (see upright/explore.py)
+# ──────────────────────────────────────────────────────────────────────────────
+def _toggle_follow(username):
+    engine = get_feed_engine()
+    me = current_session().profile.username
+    if engine.is_following(me, username):
+        engine.unfollow(me, username)
+    else:
+        engine.follow(me, username)
+        get_notification_bus().publish(username, "follow", me)
+
+
+def show_profile_row(username, full_name, key_prefix, detail=""):
+    col1, col2 = st.columns((4, 1))
+    col1.markdown(f"**{full_name}** @{username}{detail}")
+    me = current_session().profile.username
+    if username != me:
+        following = get_feed_engine().is_following(me, username)
+        col2.button(
+            "Unfollow" if following else "Follow",
+            key=f"{key_prefix}_follow_{username}",
+            on_click=_toggle_follow,
+            args=(username,),
+        )
+
+
+def show_explore():
+    st.title("🔍 Explore")
+    st.markdown("---")
+    st.write("Discover trending profiles and connect with other UpRight users.")
+    explore_search()
+    explore_trending()
+    explore_leaders()
+
+
+@st.fragment
+@timed("explore_search")
+def explore_search():
+    query = st.text_input("Search profiles", key="explore_query", placeholder="Search by username or name")
+    if query.strip():
+        results = get_explore_index().search(query)
+        if not results:
+            st.write("No profiles found.")
+        for username, full_name in results:
+            show_profile_row(username, full_name, key_prefix="search")
+
+
+@st.fragment
+@timed("explore_trending")
+def explore_trending():
+    st.markdown("---")
+    st.subheader("🔥 Trending Profiles")
+    trending = get_explore_index().trending()
+    if not trending:
+        st.info("No trending profiles yet. Keep saving your indicators to show up here!")
+    for rank, (username, full_name, score) in enumerate(trending, start=1):
+        show_profile_row(username, full_name, key_prefix="trending", detail=f" · #{rank} ({score:+.1f})")
+
+
+@st.fragment
+@timed("explore_leaders")
+def explore_leaders():
+    # Ranked straight from the precomputed derived-metrics columns
+    st.markdown("---")
+    st.subheader("🏅 Leaders")
+    column = st.selectbox(
+        "Rank by", list(LEADER_METRICS), format_func=lambda c: LEADER_METRICS[c][0], key="explore_leader_metric"
+    )
+    leaders = get_derived_metrics().leaders(column)
+    if not leaders:
+        st.info("Nobody is on this board yet.")
+        return
+    fmt = LEADER_METRICS[column][1]
+    index = get_explore_index()
+    for rank, (username, value) in enumerate(leaders, start=1):
+        show_profile_row(username, index.full_name(username), key_prefix="leaders", detail=f" · #{rank} ({fmt.format(value)})")
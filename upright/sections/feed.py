@@ -0,0 +1,105 @@
+import streamlit as st
+
+from upright.feed import REACTIONS
+from upright.instrumentation import timed
+from upright.resources import current_session, get_feed_engine, get_notification_bus, get_profile_store
+from upright.sections import reset_feed_pages
+
+# ──────────────────────────────────────────────────────────────────────────────
+# FEED SECTION
+#
+# Only the first page of the timeline is loaded when the page opens; "Load
+# more" fetches the next page from the stored cursor and appends it. Posting
+# a moment reruns the feed fragment, reacting reruns only the timeline.
+# ──────────────────────────────────────────────────────────────────────────────
+def _load_feed_page():
+    posts, cursor = get_feed_engine().page(current_session().profile.username, st.session_state.feed_cursor)
+    st.session_state.feed_post_ids.extend(post.post_id for post in posts)
+    st.session_state.feed_cursor = cursor
+
+
+def _publish_moment():
+    text = st.session_state.moment_text.strip()
+    if text:
+        get_feed_engine().publish(current_session().profile.username, text)
+        # Start again from the head so the new moment shows up first
+        reset_feed_pages()
+
+
+def _toggle_reaction(post_id, emoji):
+    engine = get_feed_engine()
+    me = current_session().profile.username
+    if engine.toggle_reaction(post_id, me, emoji):
+        get_notification_bus().publish(engine.get_post(post_id).author, "reaction", me, target=post_id)
+
+
+def _add_comment(post_id):
+    text = st.session_state[f"comment_text_{post_id}"].strip()
+    if text:
+        engine = get_feed_engine()
+        me = current_session().profile.username
+        engine.add_comment(post_id, me, text)
+        get_notification_bus().publish(engine.get_post(post_id).author, "comment", me, target=post_id, detail=text)
+
+
+def show_feed():
+    st.title("📱 UpRight Feed")
+    st.markdown("---")
+    feed_page()
+
+
+@st.fragment
+@timed("feed_page")
+def feed_page():
+    with st.form(key="moment_form", clear_on_submit=True):
+        st.text_area(
+            "Share a moment",
+            key="moment_text",
+            placeholder="Finished my third book this month! 📚",
+        )
+        st.form_submit_button(label="Post", type="primary", on_click=_publish_moment)
+
+    feed_timeline()
+
+
+@st.fragment
+@timed("feed_timeline")
+def feed_timeline():
+    if st.session_state.get("feed_post_ids") is None:
+        st.session_state.feed_post_ids = []
+        st.session_state.feed_cursor = None
+        _load_feed_page()
+
+    engine = get_feed_engine()
+    if not st.session_state.feed_post_ids:
+        st.info("Nothing here yet. Share a moment or follow people from Explore!")
+        return
+
+    # Posts, reactions and comments for every loaded page in three queries
+    posts = engine.get_posts(st.session_state.feed_post_ids)
+    # One batched profile read for every author on the loaded pages
+    authors = get_profile_store().get_many(post.author for post in posts)
+    for post in posts:
+        post_id = post.post_id
+        author = authors.get(post.author)
+        with st.container(border=True):
+            name = f"**{author['full_name']}** " if author else ""
+            st.markdown(f"{name}@{post.author} · {post.created_at:%b %d, %H:%M}")
+            st.write(post.text)
+            cols = st.columns(len(REACTIONS) + 3)
+            for col, emoji in zip(cols, REACTIONS):
+                col.button(
+                    f"{emoji} {post.reaction_count(emoji)}",
+                    key=f"react_{post_id}_{emoji}",
+                    on_click=_toggle_reaction,
+                    args=(post_id, emoji),
+                )
+            with st.expander(f"💬 Comments ({len(post.comments)})"):
+                for comment in post.comments:
+                    st.markdown(f"**@{comment.author}**: {comment.text}")
+                with st.form(key=f"comment_form_{post_id}", clear_on_submit=True):
+                    st.text_input("Add a comment", key=f"comment_text_{post_id}")
+                    st.form_submit_button(label="Comment", on_click=_add_comment, args=(post_id,))
+
+    if st.session_state.feed_cursor is not None:
+        st.button("Load more", key="feed_load_more", on_click=_load_feed_page)
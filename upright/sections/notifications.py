@@ -0,0 +1,37 @@
+import streamlit as st
+
+from upright.instrumentation import timed
+from upright.resources import NOTIFICATION_REFRESH_SECONDS, current_username, get_notification_bus
+
+# ──────────────────────────────────────────────────────────────────────────────
+# NOTIFICATIONS SECTION
+# New items are picked up by a periodic fragment refresh, not full reruns
+# ──────────────────────────────────────────────────────────────────────────────
+def _mark_notifications_read():
+    get_notification_bus().mark_all_read(current_username())
+
+
+def show_notifications():
+    st.title("🔔 Notifications")
+    st.markdown("---")
+    notifications_inbox()
+
+
+@st.fragment(run_every=NOTIFICATION_REFRESH_SECONDS)
+@timed("notifications_inbox")
+def notifications_inbox():
+    bus = get_notification_bus()
+    me = current_username()
+    notes = bus.recent(me)
+    if not notes:
+        st.write("You will see notifications here when someone interacts with your feed or follows you.")
+        return
+
+    if bus.unread_count(me):
+        st.button("Mark all as read", key="notifications_mark_read", on_click=_mark_notifications_read)
+    for note in notes:
+        marker = "🔵 " if not note.read else ""
+        line = f"{marker}{note.message()} · {note.updated_at:%b %d, %H:%M}"
+        if note.detail:
+            line += f"  \n_“{note.detail}”_"
+        st.markdown(line)
@@ -0,0 +1,206 @@
+import streamlit as st
+
+from upright.avatars import PREVIEW_SIZE, ingest_upload, thumbnail_path
+from upright.profile_store import UsernameTaken
+from upright.resources import (
+    current_session,
+    get_derived_metrics,
+    get_explore_index,
+    get_feed_engine,
+    get_indicator_store,
+    get_notification_bus,
+    get_profile_store,
+    get_write_behind,
+    set_current_username,
+)
+from upright.write_behind import FLUSH_WAIT_SECONDS
+
+# ──────────────────────────────────────────────────────────────────────────────
+# AVATAR UPLOADS
+# The default robot avatar is bundled under assets/ (see upright/avatars.py)
+# ──────────────────────────────────────────────────────────────────────────────
+def ingest_avatar(photo_uploader):
+    # Returns the avatar's content hash, or None if the file isn't a readable image
+    from PIL import UnidentifiedImageError
+
+    try:
+        return ingest_upload(photo_uploader.getvalue())
+    except (UnidentifiedImageError, OSError):
+        return None
+
+
+def show_avatar_preview(photo_uploader, caption):
+    key = ingest_avatar(photo_uploader)
+    if key is None:
+        st.warning("That file doesn't look like a JPG or PNG image.")
+    else:
+        st.image(thumbnail_path(key, PREVIEW_SIZE), caption=caption, width=PREVIEW_SIZE, output_format="PNG")
+
+# ──────────────────────────────────────────────────────────────────────────────
+# PROFILE CREATION FORM
+#
+# Form submits are handled in `on_click` callbacks, which Streamlit runs
+# before the script. The rerun triggered by the submit therefore already
+# sees the new state, so no second forced rerun is needed.
+# ──────────────────────────────────────────────────────────────────────────────
+def _create_profile():
+    username = st.session_state.profile_username.strip()
+    full_name = st.session_state.profile_full_name.strip()
+    # Validate inputs
+    if username == "" or full_name == "":
+        st.session_state.profile_error = "Username and Full Name cannot be empty."
+        return
+    # Only the photo's content hash is kept; without a photo the default avatar is used
+    photo_uploader = st.session_state.get("profile_photo")
+    photo_key = ingest_avatar(photo_uploader) if photo_uploader is not None else None
+    bio = st.session_state.profile_accolades.strip()
+    # Save profile information in the shared store, which enforces unique usernames
+    try:
+        profile = get_profile_store().create(username, full_name, photo_key, bio=bio)
+    except UsernameTaken as exc:
+        st.session_state.profile_error = str(exc)
+        return
+    st.session_state.profile_error = None
+    # The session only keeps the keys; names and photo are read from the store
+    session = current_session()
+    session.profile.user_id = profile["user_id"]
+    set_current_username(username)
+    # The bio is stored with the profile; the session copy pre-fills the dashboard form
+    session.indicators.accolades = bio
+    get_explore_index().index_profile(username, full_name)
+    st.session_state.profile_created = True
+    st.toast("Profile created successfully! Welcome aboard 🎉")
+
+
+def show_profile_creation():
+    st.title("Welcome to UpRight")
+    st.write("Let's create your profile to get started!")
+    st.markdown("---")
+
+    with st.form(key="profile_form"):
+        col1, col2 = st.columns((1, 2), gap="large")
+        with col1:
+            st.markdown("**Upload a Profile Photo**")
+            photo_uploader = st.file_uploader(
+                "Choose an image (JPG/PNG)", type=["jpg", "png"], accept_multiple_files=False, key="profile_photo"
+            )
+            if photo_uploader is not None:
+                # Display the uploaded image
+                show_avatar_preview(photo_uploader, "Your Uploaded Photo")
+        with col2:
+            st.text_input(
+                "Username",
+                key="profile_username",
+                placeholder="e.g., john_doe",
+            )
+            st.text_input(
+                "Full Name",
+                key="profile_full_name",
+                placeholder="e.g., John Doe",
+            )
+            st.text_area(
+                "Short Bio / Accolades",
+                key="profile_accolades",
+                help="Share a few lines about yourself or your accolades",
+                placeholder="I’m a finance enthusiast, avid reader, and life‐long learner..."
+            )
+        st.form_submit_button(label="Create Profile", type="primary", on_click=_create_profile)
+        if st.session_state.get("profile_error"):
+            st.error(st.session_state.profile_error)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# PROFILE EDIT FORM
+# ──────────────────────────────────────────────────────────────────────────────
+def _edit_photo_key():
+    return f"edit_photo_{st.session_state.get('edit_photo_generation', 0)}"
+
+
+def _save_profile_edit():
+    new_username = st.session_state.edit_username.strip()
+    new_full_name = st.session_state.edit_full_name.strip()
+    if new_username == "" or new_full_name == "":
+        st.session_state.profile_error = "Username and Full Name cannot be empty."
+        return
+    changes = {"full_name": new_full_name, "bio": st.session_state.edit_accolades.strip()}
+    photo_uploader = st.session_state.get(_edit_photo_key())
+    if photo_uploader is not None:
+        photo_key = ingest_avatar(photo_uploader)
+        if photo_key is not None:
+            changes["photo_key"] = photo_key
+    session = current_session()
+    write_behind = get_write_behind()
+    old_username = session.profile.username
+    if new_username != old_username:
+        # A rename needs the uniqueness check, so it is written now, after
+        # any saves still queued under the old name
+        if not write_behind.flush(timeout=FLUSH_WAIT_SECONDS):
+            st.session_state.profile_error = "Your recent saves are still being written. Try again in a moment."
+            return
+        try:
+            # Everything stored under the username moves in the same transaction
+            get_profile_store().rename(
+                session.profile.user_id,
+                new_username,
+                cascade=(get_indicator_store(), get_derived_metrics(), get_feed_engine()),
+            )
+        except UsernameTaken as exc:
+            st.session_state.profile_error = str(exc)
+            return
+        # ...and the in-memory indexes follow once it has committed
+        get_explore_index().rename_profile(old_username, new_username, new_full_name)
+        get_notification_bus().rename_user(old_username, new_username)
+    else:
+        get_explore_index().index_profile(new_username, new_full_name)
+    st.session_state.profile_error = None
+    # Name, photo and bio are written behind; readers overlay pending_profile()
+    write_behind.update_profile(session.profile.user_id, **changes)
+    set_current_username(new_username)
+    session.indicators.accolades = changes["bio"]
+    if photo_uploader is not None:
+        # The photo now lives in the avatar cache; a fresh uploader key drops
+        # the uploaded bytes from session state instead of keeping them around
+        st.session_state.edit_photo_generation = st.session_state.get("edit_photo_generation", 0) + 1
+    st.toast("Profile updated successfully!")
+
+
+def show_profile_edit():
+    # Not a fragment: a profile change must also refresh the sidebar summary,
+    # so the submit takes the (single) full-script rerun.
+    st.title("Edit Your Profile")
+    st.markdown("---")
+    session = current_session()
+    user_id = session.profile.user_id
+    profile = {**get_profile_store().get(user_id), **get_write_behind().pending_profile(user_id)}
+
+    with st.form(key="edit_profile_form"):
+        col1, col2 = st.columns((1, 2), gap="large")
+        with col1:
+            st.markdown("**Change Profile Photo**")
+            photo_uploader = st.file_uploader(
+                "Upload a new image (JPG/PNG)", type=["jpg", "png"], accept_multiple_files=False, key=_edit_photo_key()
+            )
+            if photo_uploader is not None:
+                show_avatar_preview(photo_uploader, "Preview")
+        with col2:
+            st.text_input(
+                "Username",
+                value=profile["username"],
+                placeholder="e.g., john_doe",
+                key="edit_username",
+            )
+            st.text_input(
+                "Full Name",
+                value=profile["full_name"],
+                placeholder="e.g., John Doe",
+                key="edit_full_name",
+            )
+            st.text_area(
+                "Short Bio / Accolades",
+                value=profile["bio"],
+                help="Share a few lines about yourself or your accolades",
+                key="edit_accolades",
+            )
+        st.form_submit_button(label="Save Changes", type="primary", on_click=_save_profile_edit)
+        if st.session_state.get("profile_error"):
+            st.error(st.session_state.profile_error)
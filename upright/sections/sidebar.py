@@ -0,0 +1,56 @@
+import streamlit as st
+
+from upright.avatars import SIDEBAR_SIZE, thumbnail_path
+from upright.instrumentation import timed
+from upright.resources import (
+    NOTIFICATION_REFRESH_SECONDS,
+    current_session,
+    current_username,
+    get_notification_bus,
+    get_profile_store,
+    get_write_behind,
+)
+from upright.sections import reset_feed_pages
+
+# ──────────────────────────────────────────────────────────────────────────────
+# NAVIGATION: Build sidebar with profile summary + section selection
+# ──────────────────────────────────────────────────────────────────────────────
+@st.fragment
+@timed("sidebar_profile_summary")
+def sidebar_profile_summary():
+    user_id = current_session().profile.user_id
+    # A name or photo change may still be queued in the write-behind queue
+    profile = {**get_profile_store().get(user_id), **get_write_behind().pending_profile(user_id)}
+    # The thumbnail is already an 80px PNG, so Streamlit serves it as-is. The
+    # keyed container gets the st-key-profile_avatar class (assets/theme.css)
+    with timed("avatar_image"), st.container(key="profile_avatar"):
+        st.image(thumbnail_path(profile["photo_key"], SIDEBAR_SIZE), width=SIDEBAR_SIZE, caption=None, output_format="PNG")
+
+    st.markdown(f"**{profile['full_name']}**")
+    st.markdown(f"@{profile['username']}")
+    st.markdown("---")
+
+
+@st.fragment(run_every=NOTIFICATION_REFRESH_SECONDS)
+@timed("sidebar_notification_badge")
+def sidebar_notification_badge():
+    unread = get_notification_bus().unread_count(current_username())
+    if unread:
+        st.markdown(f"🔔 **{unread}** new notification{'s' if unread > 1 else ''}")
+
+
+def show_sidebar_nav():
+    with st.sidebar:
+        sidebar_profile_summary()
+        sidebar_notification_badge()
+
+    # Switching sections changes the whole page, so this stays outside any fragment
+    choice = st.sidebar.radio(
+        "Go to",
+        ["Dashboard", "Edit Profile", "Feed", "Explore", "Notifications"],
+        index=0,
+        key="nav_section",
+        # Re-opening the Feed always starts from the newest moments
+        on_change=reset_feed_pages,
+    )
+    return choice
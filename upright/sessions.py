@@ -0,0 +1,135 @@
+import os
+import pickle
+import threading
+import time
+
+from upright.db import DEFAULT_DATA_DIR
+from upright.instrumentation import approximate_size
+from upright.records import SessionRecords
+
+# ──────────────────────────────────────────────────────────────────────────────
+# SESSION VAULT + IDLE SPILLING
+#
+# Per-session records live in one process-wide vault, and st.session_state
+# only keeps the vault key. A sweeper thread spills sessions that have been
+# idle longer than `idle_seconds` to disk and drops them from memory. When
+# the session comes back, the next checkout() rehydrates it. Spill files
+# nobody reclaimed within `spill_ttl_seconds` (closed tabs) are deleted.
+# ──────────────────────────────────────────────────────────────────────────────
+
+SESSION_IDLE_SECONDS = float(os.environ.get("UPRIGHT_SESSION_IDLE_SECONDS", "600"))
+SESSION_SPILL_TTL_SECONDS = float(os.environ.get("UPRIGHT_SESSION_SPILL_TTL_SECONDS", str(7 * 24 * 3600)))
+SESSION_SWEEP_INTERVAL_SECONDS = float(os.environ.get("UPRIGHT_SESSION_SWEEP_SECONDS", "60"))
+SESSION_SPILL_DIR = os.path.join(DEFAULT_DATA_DIR, "sessions")
+
+
+class SessionVault:
+    """Process-wide home of every session's records, with idle spill to disk."""
+
+    def __init__(
+        self,
+        spill_dir=SESSION_SPILL_DIR,
+        idle_seconds=SESSION_IDLE_SECONDS,
+        spill_ttl_seconds=SESSION_SPILL_TTL_SECONDS,
+        sweep_interval=SESSION_SWEEP_INTERVAL_SECONDS,
+        start_sweeper=True,
+    ):
+        self.spill_dir = spill_dir
+        self.idle_seconds = idle_seconds
+        self.spill_ttl_seconds = spill_ttl_seconds
+        self._lock = threading.Lock()
+        self._resident = {}  # key -> (SessionRecords, last_seen monotonic time)
+        self.spills = 0
+        self.rehydrations = 0
+        os.makedirs(spill_dir, exist_ok=True)
+        if start_sweeper:
+            self._stop = threading.Event()
+            threading.Thread(target=self._sweep_forever, args=(sweep_interval,), name="upright-session-sweeper", daemon=True).start()
+
+    def _spill_path(self, key):
+        return os.path.join(self.spill_dir, f"{key}.pkl")
+
+    def checkout(self, key):
+        """Records for session `key`: resident, rehydrated from disk, or new."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._resident.get(key)
+            if entry is not None:
+                records = entry[0]
+            else:
+                records = self._rehydrate(key)
+                if records is None:
+                    records = SessionRecords()
+            self._resident[key] = (records, now)
+            return records
+
+    def _rehydrate(self, key):
+        path = self._spill_path(key)
+        try:
+            with open(path, "rb") as f:
+                records = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        os.remove(path)
+        self.rehydrations += 1
+        return records
+
+    def spill_idle(self, now=None):
+        """Spill every session idle longer than idle_seconds; returns how many were spilled."""
+        now = time.monotonic() if now is None else now
+        spilled = 0
+        with self._lock:
+            idle = [key for key, (_, last_seen) in self._resident.items() if now - last_seen >= self.idle_seconds]
+            for key in idle:
+                path = self._spill_path(key)
+                tmp_path = f"{path}.tmp"
+                try:
+                    with open(tmp_path, "wb") as f:
+                        pickle.dump(self._resident[key][0], f, protocol=pickle.HIGHEST_PROTOCOL)
+                    os.replace(tmp_path, path)
+                except Exception:
+                    # Disk full or unpicklable: the session stays resident and
+                    # is retried on the next sweep
+                    try:
+                        os.remove(tmp_path)
+                    except OSError:
+                        pass
+                    continue
+                # Only dropped once the spill file is in place
+                del self._resident[key]
+                spilled += 1
+            self.spills += spilled
+        return spilled
+
+    def purge_expired_spills(self):
+        cutoff = time.time() - self.spill_ttl_seconds
+        for name in os.listdir(self.spill_dir):
+            path = os.path.join(self.spill_dir, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _sweep_forever(self, interval):
+        while not self._stop.wait(interval):
+            try:
+                self.spill_idle()
+                self.purge_expired_spills()
+            except OSError:
+                # e.g. an unreadable spill dir; failed spills already stay resident
+                pass
+
+    def memory_report(self):
+        """Resident/spilled session counts and approximate resident bytes."""
+        with self._lock:
+            resident = [records for records, _ in self._resident.values()]
+        sizes = [approximate_size(records) for records in resident]
+        return {
+            "resident_sessions": len(resident),
+            "spilled_sessions": sum(1 for name in os.listdir(self.spill_dir) if name.endswith(".pkl")),
+            "resident_bytes": sum(sizes),
+            "bytes_per_resident_session": (sum(sizes) / len(sizes)) if sizes else 0,
+            "spills": self.spills,
+            "rehydrations": self.rehydrations,
+        }
@@ -0,0 +1,86 @@
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+from upright.db import DEFAULT_DATA_DIR
+from upright.instrumentation import timed
+
+# ──────────────────────────────────────────────────────────────────────────────
+# LAZY SECTION LOADING + STARTUP REPORT
+#
+# Section modules (and whatever heavy libraries they pull in) are imported
+# the first time a user opens that section. Per process we record how long
+# each import took and how long the section's first render took, including
+# any lazy imports it triggered. One JSON line per section goes to
+# STARTUP_REPORT_PATH, so cold-start cost after a deploy is visible.
+# ──────────────────────────────────────────────────────────────────────────────
+
+PROCESS_START = time.perf_counter()
+
+STARTUP_REPORT_PATH = os.environ.get("UPRIGHT_STARTUP_REPORT", os.path.join(DEFAULT_DATA_DIR, "startup.jsonl"))
+
+_lock = threading.Lock()
+_import_seconds = {}
+_first_render_seconds = {}
+
+
+def load_section(name):
+    module_name = f"upright.sections.{name}"
+    module = sys.modules.get(module_name)
+    if module is not None:
+        return module
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    with _lock:
+        _import_seconds.setdefault(name, time.perf_counter() - start)
+    return module
+
+
+def render_section(name, function_name):
+    """Import section `name` on first use and call its `function_name`."""
+    render = timed(function_name)(getattr(load_section(name), function_name))
+    if name in _first_render_seconds:
+        return render()
+
+    start = time.perf_counter()
+    result = render()
+    elapsed = time.perf_counter() - start
+    with _lock:
+        if name in _first_render_seconds:
+            return result
+        _first_render_seconds[name] = elapsed
+    _write_report_line(name)
+    return result
+
+
+def startup_report():
+    """Import and first-render times (ms) for every section used so far in this process."""
+    with _lock:
+        return {
+            name: {
+                "import_ms": round(_import_seconds.get(name, 0.0) * 1000, 3),
+                "first_render_ms": round(_first_render_seconds[name] * 1000, 3) if name in _first_render_seconds else None,
+            }
+            for name in sorted(set(_import_seconds) | set(_first_render_seconds))
+        }
+
+
+def _write_report_line(name):
+    line = {
+        "ts": datetime.now().isoformat(timespec="seconds"),
+        "pid": os.getpid(),
+        "section": name,
+        "since_process_start_ms": round((time.perf_counter() - PROCESS_START) * 1000, 3),
+        **startup_report()[name],
+    }
+    try:
+        os.makedirs(os.path.dirname(STARTUP_REPORT_PATH), exist_ok=True)
+        with open(STARTUP_REPORT_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps(line) + "\n")
+    except OSError:
+        # The report is diagnostics only; never fail a render over it
+        pass
@@ -0,0 +1,404 @@
+import atexit
+import json
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, see _orphan_journals()
+    fcntl = None
+
+from upright.db import DEFAULT_DATA_DIR
+from upright.indicator_store import NUMERIC_INDICATORS
+from upright.instrumentation import COUNT_BUCKETS, DURATION_BUCKETS, registry
+
+# ──────────────────────────────────────────────────────────────────────────────
+# WRITE-BEHIND QUEUE FOR SAVES
+#
+# "Save Indicators" and the name / photo / bio part of "Save Changes" are handed
+# to this queue instead of being written on the click. A save is appended
+# to this process's journal, then kept pending in memory; a
+# second save from the same user before the writer gets to it replaces the
+# first (profile fields are merged). One writer thread per process commits
+# everything pending in a single transaction: indicator snapshots with
+# their rollups, derived metrics and profile fields.
+#
+# The same transaction records which journal entries it applied in
+# `write_behind_applied`, so replaying a journal is exactly-once: at
+# startup, journals left by a crashed process (their lock file is no longer
+# held) are replayed, skipping what already committed, and deleted. A
+# journal is truncated whenever its queue drains, and the queue is flushed
+# at interpreter exit.
+#
+# Renames stay synchronous (they need the uniqueness check and cascade to
+# every store); flush() first so pending saves land under the old name.
+# Readers never wait for the writer: they overlay pending_profile() or
+# pending_indicators() on what is committed.
+# ──────────────────────────────────────────────────────────────────────────────
+
+WRITE_BEHIND_DIR = os.path.join(DEFAULT_DATA_DIR, "write_behind")
+# Extra time the writer lets a batch fill. By default there is none: saves
+# arriving while a batch commits already make up the next one.
+WRITE_BEHIND_LINGER_SECONDS = float(os.environ.get("UPRIGHT_WRITE_BEHIND_LINGER_SECONDS", "0"))
+WRITE_BEHIND_MAX_BATCH = int(os.environ.get("UPRIGHT_WRITE_BEHIND_MAX_BATCH", "500"))
+# Journal lines are flushed to the OS on every save, which survives a crash
+# of the process, like the database's synchronous=NORMAL (upright/db.py).
+# Set to 1 to also fsync each line and survive power loss.
+WRITE_BEHIND_FSYNC = os.environ.get("UPRIGHT_WRITE_BEHIND_FSYNC", "0") == "1"
+# Longest a rename waits for the queue to drain before giving up
+FLUSH_WAIT_SECONDS = 2.0
+RETRY_SECONDS = 0.5
+MAX_RETRY_SECONDS = 30.0
+
+registry.register("upright_write_queue_depth", "Pending write-behind saves, observed on every enqueue.", "kind", COUNT_BUCKETS)
+registry.register("upright_write_commit_seconds", "Wall time of one write-behind batch transaction.", "outcome", DURATION_BUCKETS)
+registry.register("upright_write_batch_size", "Saves committed per write-behind batch.", "kind", COUNT_BUCKETS)
+
+
+@dataclass(slots=True)
+class PendingWrite:
+    kind: str  # "indicators" (key: username) or "profile" (key: user_id)
+    key: object
+    payload: dict
+    seqs: list = field(default_factory=list)  # journal entries folded into this write
+
+    def to_json(self):
+        return json.dumps({"seqs": self.seqs, "kind": self.kind, "key": self.key, "payload": self.payload}, separators=(",", ":"))
+
+    def absorb(self, other):
+        # Last save wins; profile updates only touch the fields they name
+        self.payload = {**self.payload, **other.payload} if self.kind == "profile" else other.payload
+        self.seqs.extend(other.seqs)
+
+
+def _read_journal(path, applied=frozenset()):
+    """Pending writes in a journal, coalesced per (kind, key) in order, skipping `applied` seqs."""
+    writes = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # A torn last line: that save never returned to the user
+                continue
+            # Drop committed lines before coalescing, so a committed save
+            # doesn't take a later uncommitted one with it
+            seqs = [seq for seq in entry["seqs"] if seq not in applied]
+            if not seqs:
+                continue
+            write = PendingWrite(entry["kind"], entry["key"], entry["payload"], seqs)
+            current = writes.get((write.kind, write.key))
+            if current is None:
+                writes[(write.kind, write.key)] = write
+            else:
+                current.absorb(write)
+    return list(writes.values())
+
+
+class WriteBehindQueue:
+    """Journaled, coalescing write-behind queue with one writer thread."""
+
+    def __init__(
+        self,
+        store,
+        derived,
+        profiles,
+        percentiles=None,
+        journal_dir=WRITE_BEHIND_DIR,
+        linger=WRITE_BEHIND_LINGER_SECONDS,
+        max_batch=WRITE_BEHIND_MAX_BATCH,
+        fsync=WRITE_BEHIND_FSYNC,
+    ):
+        self.store = store
+        self.derived = derived
+        self.profiles = profiles
+        self.percentiles = percentiles
+        self.pool = store.pool
+        self.journal_dir = journal_dir
+        self.linger = linger
+        self.max_batch = max_batch
+        self.fsync = fsync
+        self.stats = {"enqueued": 0, "coalesced": 0, "committed": 0, "batches": 0, "failed_batches": 0, "replayed": 0}
+        self._cond = threading.Condition()
+        self._pending = {}  # (kind, key) -> PendingWrite, in arrival order
+        self._inflight = {}  # the batch being committed
+        self._seq = 0
+        self._prune_through = 0  # applied markers up to here are no longer in the journal
+        self._closing = False
+        self._abandoned = False  # set if the writer gave up on shutdown
+        self._create_schema()
+
+        os.makedirs(journal_dir, exist_ok=True)
+        self.journal_id = uuid.uuid4().hex
+        self.journal_path = os.path.join(journal_dir, f"{self.journal_id}.jsonl")
+        # Held for the life of the process; a journal whose lock is free is an orphan
+        self._lock_file = open(os.path.join(journal_dir, f"{self.journal_id}.lock"), "w")
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            self.replay_orphans()
+            self._journal = open(self.journal_path, "a", encoding="utf-8")
+        except BaseException:
+            # Nothing was journaled yet, so nothing of this queue is left to replay
+            self._lock_file.close()
+            os.remove(self._lock_file.name)
+            raise
+
+        self._thread = threading.Thread(target=self._write_forever, name="upright-write-behind", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _create_schema(self):
+        with self.pool.connection() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS write_behind_applied (
+                    journal TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    PRIMARY KEY (journal, seq)
+                ) WITHOUT ROWID
+                """
+            )
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # ENQUEUE
+    # ──────────────────────────────────────────────────────────────────────────
+    def save_indicators(self, username, indicators, ts=None):
+        """Queue an indicator snapshot for `username`; returns its ISO timestamp."""
+        ts_text = (ts or datetime.now()).isoformat(timespec="seconds")
+        payload = {name: float(indicators[name]) for name in NUMERIC_INDICATORS}
+        payload.update(ts=ts_text, accolades=indicators.get("accolades", ""))
+        self._enqueue(PendingWrite("indicators", username, payload))
+        return ts_text
+
+    def update_profile(self, user_id, **fields):
+        """Queue a full_name / photo_key / bio change. Usernames go through ProfileStore.rename()."""
+        unknown = set(fields) - {"full_name", "photo_key", "bio"}
+        if unknown:
+            raise ValueError(f"Fields that can't be written behind: {sorted(unknown)}")
+        if fields:
+            self._enqueue(PendingWrite("profile", user_id, fields))
+
+    def _enqueue(self, write):
+        with self._cond:
+            if self._closing:
+                raise RuntimeError("The write-behind queue is closed")
+            self._seq += 1
+            write.seqs.append(self._seq)
+            # Durable before the click returns: a crash from here on is replayed
+            self._journal.write(write.to_json() + "\n")
+            self._journal.flush()
+            if self.fsync:
+                os.fsync(self._journal.fileno())
+            current = self._pending.get((write.kind, write.key))
+            if current is None:
+                self._pending[(write.kind, write.key)] = write
+            else:
+                current.absorb(write)
+                self.stats["coalesced"] += 1
+            self.stats["enqueued"] += 1
+            registry.observe("upright_write_queue_depth", write.kind, len(self._pending))
+            self._cond.notify_all()
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # READ-YOUR-WRITES
+    # ──────────────────────────────────────────────────────────────────────────
+    def pending_profile(self, user_id):
+        """Profile fields saved but not yet committed, to overlay on a ProfileStore read."""
+        with self._cond:
+            fields = {}
+            for writes in (self._inflight, self._pending):
+                write = writes.get(("profile", user_id))
+                if write is not None:
+                    fields.update(write.payload)
+            return fields
+
+    def pending_indicators(self, username):
+        """The snapshot `username` saved that is not committed yet, or None."""
+        key = ("indicators", username)
+        with self._cond:
+            write = self._pending.get(key) or self._inflight.get(key)
+            return dict(write.payload) if write is not None else None
+
+    def flush(self, timeout=None):
+        """Block until everything queued so far is committed; False on timeout."""
+        with self._cond:
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: (not self._pending and not self._inflight) or self._abandoned, timeout)
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # WRITER
+    # ──────────────────────────────────────────────────────────────────────────
+    def _write_forever(self):
+        backoff = RETRY_SECONDS
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._closing)
+                if not self._pending:
+                    return
+            if self.linger and not self._closing:
+                # Let saves arriving in the same instant share the transaction
+                time.sleep(self.linger)
+            with self._cond:
+                keys = list(self._pending)[: self.max_batch]
+                self._inflight = {key: self._pending.pop(key) for key in keys}
+                batch = list(self._inflight.values())
+            try:
+                self._commit(self.journal_id, batch)
+            except Exception:
+                # Database busy or down: put the batch back (newer saves win) and retry
+                with self._cond:
+                    for key, write in self._inflight.items():
+                        newer = self._pending.get(key)
+                        if newer is not None:
+                            write.absorb(newer)
+                        self._pending[key] = write
+                    self._pending = {key: self._pending[key] for key in (*self._inflight, *self._pending)}
+                    self._inflight = {}
+                    closing = self._closing
+                self.stats["failed_batches"] += 1
+                if closing:
+                    # Give up on shutdown; the journal is replayed at the next start
+                    with self._cond:
+                        self._abandoned = True
+                        self._cond.notify_all()
+                    return
+                time.sleep(backoff)
+                backoff = min(backoff * 2, MAX_RETRY_SECONDS)
+                continue
+            backoff = RETRY_SECONDS
+            with self._cond:
+                self._inflight = {}
+                if not self._pending:
+                    self._compact_journal()
+                self._cond.notify_all()
+
+    def _commit(self, journal_id, batch):
+        start = time.perf_counter()
+        snapshots = []
+        try:
+            with self.pool.transaction() as conn:
+                if journal_id == self.journal_id and self._prune_through:
+                    conn.execute(
+                        "DELETE FROM write_behind_applied WHERE journal = ? AND seq <= ?", [journal_id, self._prune_through]
+                    )
+                for write in batch:
+                    if write.kind == "indicators":
+                        ts = datetime.fromisoformat(write.payload["ts"])
+                        self.store.insert_snapshot(conn, write.key, write.payload, ts)
+                        self.derived.advance(conn, write.key, write.payload["ts"], write.payload)
+                        snapshots.append(write.payload)
+                    else:
+                        self.profiles.apply_update(conn, write.key, write.payload)
+                conn.executemany(
+                    "INSERT OR IGNORE INTO write_behind_applied (journal, seq) VALUES (?, ?)",
+                    [(journal_id, seq) for write in batch for seq in write.seqs],
+                )
+        except Exception:
+            registry.observe("upright_write_commit_seconds", "failed", time.perf_counter() - start)
+            raise
+        registry.observe("upright_write_commit_seconds", "committed", time.perf_counter() - start)
+        if journal_id == self.journal_id:
+            self._prune_through = 0
+        for kind in ("indicators", "profile"):
+            count = sum(1 for write in batch if write.kind == kind)
+            if count:
+                registry.observe("upright_write_batch_size", kind, count)
+        self.stats["committed"] += len(batch)
+        self.stats["batches"] += 1
+        if snapshots and self.percentiles is not None:
+            # Sketches are best-effort and persisted in their own transaction
+            try:
+                self.percentiles.record_values({name: [s[name] for s in snapshots] for name in NUMERIC_INDICATORS})
+            except Exception:
+                pass
+
+    def _compact_journal(self):
+        # Called with the lock held and nothing pending or in flight, so every
+        # journaled save has committed: start an empty journal. The applied
+        # markers are deleted in the next transaction.
+        if self._journal.tell() == 0:
+            return
+        try:
+            self._journal.truncate(0)
+            self._journal.seek(0)
+            if self.fsync:
+                os.fsync(self._journal.fileno())
+        except OSError:
+            # The journal just keeps its committed entries; replay skips them
+            return
+        self._prune_through = self._seq
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # RECOVERY + SHUTDOWN
+    # ──────────────────────────────────────────────────────────────────────────
+    def _orphan_journals(self):
+        for name in sorted(os.listdir(self.journal_dir)):
+            journal_id, ext = os.path.splitext(name)
+            if ext != ".jsonl" or journal_id == self.journal_id:
+                continue
+            lock_path = os.path.join(self.journal_dir, f"{journal_id}.lock")
+            lock_file = open(lock_path, "a")
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    # A live process still owns it
+                    lock_file.close()
+                    continue
+            path = os.path.join(self.journal_dir, name)
+            if not os.path.exists(path):
+                # Another worker replayed it after we listed the directory; our
+                # open() recreated the lock file it had deleted
+                lock_file.close()
+                try:
+                    os.remove(lock_path)
+                except FileNotFoundError:
+                    pass
+                continue
+            # Without advisory locks (Windows) a single process per data dir is assumed
+            yield journal_id, path, lock_path, lock_file
+
+    def replay_orphans(self):
+        """Commit what crashed processes left in their journals; returns the number of writes replayed."""
+        replayed = 0
+        for journal_id, path, lock_path, lock_file in self._orphan_journals():
+            with lock_file:
+                with self.pool.connection() as conn:
+                    applied = {row[0] for row in conn.execute("SELECT seq FROM write_behind_applied WHERE journal = ?", [journal_id])}
+                batch = _read_journal(path, applied)
+                for start in range(0, len(batch), self.max_batch):
+                    self._commit(journal_id, batch[start:start + self.max_batch])
+                with self.pool.transaction() as conn:
+                    conn.execute("DELETE FROM write_behind_applied WHERE journal = ?", [journal_id])
+                os.remove(path)
+                os.remove(lock_path)
+            replayed += len(batch)
+        self.stats["replayed"] += replayed
+        return replayed
+
+    def close(self, timeout=10.0):
+        """Flush pending saves and stop the writer (registered with atexit)."""
+        with self._cond:
+            if self._closing:
+                return
+            self._closing = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        with self._cond:
+            drained = not self._pending and not self._inflight
+            self._journal.close()
+        if drained and not self._thread.is_alive():
+            # Everything committed: nothing to replay, so the journal can go
+            try:
+                with self.pool.transaction() as conn:
+                    conn.execute("DELETE FROM write_behind_applied WHERE journal = ?", [self.journal_id])
+                os.remove(self.journal_path)
+                os.remove(self._lock_file.name)
+            except Exception:
+                pass
+        self._lock_file.close()